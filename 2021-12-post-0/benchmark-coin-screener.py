@@ -0,0 +1,86 @@
+"""Benchmark screening coins by their rank history.
+
+Compares the per-coin loop cmc-analysis-changers-per-week.py used
+(a 4-week resample per coin, then list scans for excluded and top
+coins) with cmcfeatures.screen_coins, on a synthetic rank matrix.
+"""
+import time
+import numpy as np
+import pandas as pd
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+from cmcfeatures import rank_deltas, screen_coins, COIN_CATEGORIES
+
+# benchmark parameters:
+number_of_weeks = 100
+number_of_coins = 5000
+repeats = 20
+seed = 0
+
+# -----------------------------------------------------
+# Build a synthetic rank matrix.
+# -----------------------------------------------------
+# ranks follow random walks; the bottom fifth of each week
+# is not listed:
+rng = np.random.default_rng(seed)
+weeks = pd.date_range(start="2020-02-02",periods=number_of_weeks,freq="W-SUN")
+ignore_coins = sum(COIN_CATEGORIES.values(),[])
+names = ignore_coins + ["Coin %d"%i for i in range(len(ignore_coins),number_of_coins)]
+walk = rng.integers(1,number_of_coins,number_of_coins) + rng.normal(
+    0,40,(number_of_weeks,number_of_coins)).cumsum(axis=0)
+ranks = walk.argsort(axis=1).argsort(axis=1) + 1.0
+ranks[ranks > 0.8*number_of_coins] = np.nan
+rankings = pd.DataFrame(ranks,index=weeks,columns=names)["2021-01-01":]
+dcmc = rank_deltas(pd.DataFrame(ranks,index=weeks,columns=names))["dmcr_per_week"]["2021-01-01":]
+current_cmc = rankings.iloc[-1].dropna().sort_values().rename_axis("name").reset_index()
+cutoff = 6
+
+# -----------------------------------------------------
+# Original per-coin loop.
+# -----------------------------------------------------
+def loop_screen():
+    coins_of_interest = []
+    for coin in dcmc:
+        monthly_changes = dcmc[coin].resample("4W").sum()
+        filtered = monthly_changes[monthly_changes<0]
+        if (len(filtered.values) > cutoff
+            and coin not in ignore_coins
+            and coin not in current_cmc.name[:50].tolist()
+            and rankings[coin].min() >= 50
+            ):
+            coins_of_interest.append(coin)
+    return coins_of_interest
+
+def matrix_screen():
+    return screen_coins(
+        rankings,
+        rank_deltas=dcmc,
+        min_negative_moves=cutoff+1,
+        min_rank=50,
+        exclude_top=50,
+        exclude_categories=list(COIN_CATEGORIES),
+        )
+
+# -----------------------------------------------------
+# Run benchmark.
+# -----------------------------------------------------
+print("%d weeks x %d coins"%(len(rankings),number_of_coins))
+t0 = time.perf_counter()
+expected = loop_screen()
+loop = time.perf_counter() - t0
+print("%-16s %9.1f ms"%("per-coin loop",loop*1e3))
+
+best = np.inf
+for _ in range(repeats):
+    t0 = time.perf_counter()
+    coins = matrix_screen()
+    best = min(best,time.perf_counter()-t0)
+print("%-16s %9.1f ms"%("screen_coins",best*1e3))
+print("speedup: %.0fx, %d coins pass"%(loop/best,len(coins)))
+
+# both give the same coins, in the same order:
+assert list(coins) == expected
@@ -10,6 +10,10 @@ from datetime import datetime
 from _path import setup_paths
 setup_paths()
 
+# personal modules:
+from cmcstore import read_panel
+from cmcfeatures import history_matrices, load_rank_deltas, screen_coins
+
 # plot setup:
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
@@ -28,84 +32,36 @@ img = imghelper(
 # -------------------------------------------------------
 # Load and process data.
 # -------------------------------------------------------
-# I deferred completing this analysis by a few weeks, 
-# so I need to concat the scrape results to update:
-mdf1 = pd.read_hdf("cmc-scrape-results-top-1000.hdf")
-mdf2 = pd.read_hdf("cmc-scrape-results-top-1000-2021-12-05.hdf")
-mdf = pd.concat([mdf1,mdf2])
-
-# get current coin market cap rankings and remove 
-# stablecoins, wrapped coins, and memecoins:
-ignore_coins = [
-    # stablecoins:
-    "Tether",
-    "Binance USD",
-    "USD Coin",
-    "TerraUSD",
-    "Neutrino USD",
-    "Dai",
-    "TrueUSD",
-    "Gemini Dollar",
-    
-    # Bitcoin, Ethereum derivatives:
-    # and wrapped coins:
-    "Bitcoin BEP2",
-    "Wrapped Bitcoin",
-    "Ethereum Classic",
-    "Wrapped BNB",
-    "Huobi BTC",
-    "RenBTC",
-    "Bitcoin Cash ABC",
-    
-    # memecoins:
-    "SHIBA INU",
-    "Dogecoin",
-    "Dogelon Mars",
-    ]
-current_cmc = mdf.loc[idx["2021-12-05",:],:].reset_index(level=1)
-ignore_coins_id = current_cmc.index.isin(ignore_coins)
-current_cmc = current_cmc[~ignore_coins_id]
-
-# create bin for market cap rankings per coin:
-rankings = pd.DataFrame(
-    np.nan,
-    index=mdf.index.levels[0],
-    columns=mdf.reset_index(level=1)["name"].unique(),    
-    )
+# every scraped week is in the scrape store (see cmcstore.py),
+# kept up to date by scrape-cmc.py; this analysis uses the
+# top 1000 coins through 2021-12-05:
+mdf = read_panel(end="2021-12-05",max_rank=1000)
 
-# extract each coin's market cap ranking time history:
-coins = mdf.reset_index(level=0).sort_index()
-coins = coins.rename(columns={"level_0": "week"})
-for col in rankings.columns:
-    data = coins.loc[col,["week","cmc_rank"]]
-    if len(data.shape) < 2:
-        rows = data.week
-        entries = data.cmc_rank
-    else:
-        rows = data.week.tolist()
-        entries = data.cmc_rank.values
-    rankings.loc[rows,col] = entries
+# each coin's market cap ranking time history, and its
+# changes per week (cached in the feature store, see
+# cmcfeatures.py):
+rankings = history_matrices(mdf,fields=["cmc_rank"])["cmc_rank"]
+dmcr_per_week = load_rank_deltas(rankings)["dmcr_per_week"]
 
 # -------------------------------------------------------
 # Look at coin ranking changes per week:
 # -------------------------------------------------------
 rankings2021 = rankings["2021-01-01":]
-dcmc = rankings.diff()["2021-01-01":]
+dcmc = dmcr_per_week["2021-01-01":]
 
 # extract coins that have experienced the most 4-week 
-# cmc changes that are still in the top-X coins today:
+# cmc changes that are still in the top-X coins today,
+# leaving out stablecoins, wrapped coins, and memecoins:
 cutoff = 6
-coins_of_interest = []
-for coin in dcmc:
-    monthly_changes = dcmc[coin].resample("4W").sum()
-    filtered = monthly_changes[monthly_changes<0]
-    if (len(filtered.values) > cutoff 
-        and coin not in ignore_coins
-        and coin not in current_cmc.name[:50].tolist()
-        #and not rankings2021[coin].isna().any()
-        and rankings2021[coin].min() >= 50
-        ):
-        coins_of_interest.append(coin) 
+coins_of_interest = screen_coins(
+    rankings2021,
+    rank_deltas=dcmc,
+    min_negative_moves=cutoff+1,
+    move_period="4W",
+    min_rank=50,
+    exclude_top=50,
+    exclude_categories=["stablecoins","derivatives","memecoins"],
+    )
 
 print(len(coins_of_interest))
 
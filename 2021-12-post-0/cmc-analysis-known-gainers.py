@@ -10,6 +10,10 @@ from datetime import datetime
 from _path import setup_paths
 setup_paths()
 
+# personal modules:
+from cmcstore import read_panel, by_name
+from cmcfeatures import history_matrices
+
 # plot setup:
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
@@ -28,11 +32,11 @@ img = imghelper(
 # -------------------------------------------------------
 # Load and process data.
 # -------------------------------------------------------
-# I deferred completing this analysis by a few weeks, 
-# so I need to concat the scrape results to update:
-mdf1 = pd.read_hdf("cmc-scrape-results-top-1000.hdf")
-mdf2 = pd.read_hdf("cmc-scrape-results-top-1000-2021-12-05.hdf")
-mdf = pd.concat([mdf1,mdf2])
+# every scraped week is in the scrape store (see cmcstore.py),
+# kept up to date by scrape-cmc.py; this analysis uses the
+# top 1000 coins through 2021-12-05:
+panel = read_panel(end="2021-12-05",max_rank=1000)
+mdf = by_name(panel)
 
 # get current coin market cap rankings and remove 
 # stablecoins, wrapped coins, and memecoins:
@@ -66,25 +70,9 @@ current_cmc = mdf.loc[idx["2021-12-05",:],:].reset_index(level=1)
 ignore_coins_id = current_cmc.index.isin(ignore_coins)
 current_cmc = current_cmc[~ignore_coins_id]
 
-# create bin for market cap rankings per coin:
-rankings = pd.DataFrame(
-    np.nan,
-    index=mdf.index.levels[0],
-    columns=mdf.reset_index(level=1)["name"].unique(),    
-    )
-
-# extract each coin's market cap ranking time history:
-coins = mdf.reset_index(level=0).sort_index()
-coins = coins.rename(columns={"level_0": "week"})
-for col in rankings.columns:
-    data = coins.loc[col,["week","cmc_rank"]]
-    if len(data.shape) < 2:
-        rows = data.week
-        entries = data.cmc_rank
-    else:
-        rows = data.week.tolist()
-        entries = data.cmc_rank.values
-    rankings.loc[rows,col] = entries
+# extract each coin's market cap ranking time history,
+# one week x coin matrix from a single pivot of the panel:
+rankings = history_matrices(panel,fields=["cmc_rank"])["cmc_rank"]
     
 # save for visual inspection and later use:
 rankings.to_excel("rankings.xlsx")
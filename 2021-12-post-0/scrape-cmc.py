@@ -15,7 +15,6 @@ https://www.zyte.com/blog/scrapy-tips-from-the-pros-june-2016/
 """
 import numpy as np 
 import pandas as pd
-import time
 from datetime import datetime,date
 
 # pandas' index slices:
@@ -23,6 +22,8 @@ idx = pd.IndexSlice
 
 # personal modules:
 import utilities as utils
+import cmcstore
+from cmcapi import scrape_listings
 
 # define time range:
 today = date.today()
@@ -35,25 +36,27 @@ sun2021 = pd.date_range(
 # exclude today:
 sun2021 = sun2021[:-1]
 
-# scrape historical data:
-pause_seconds=3
-frames = []
-for suni in sun2021:
-    print("scraping %s..."%(suni.strftime("%Y-%m-%d")))
-    output = utils.scrape_cmc_historical(suni,2000)
-    df = utils.process_json(output)
-    frames.append(df)
-    time.sleep(pause_seconds)
-
-# save:
-results = pd.concat(frames,keys=sun2021)
-results.to_hdf("cmc-scrape-results.hdf","w",mode="w")
-
-
-
-
-
-
-
-
-
+# only the weeks missing from the scrape store (see
+# cmcstore.py) are requested, so a weekly update touches a
+# single week. each week's whole coin universe is fetched in
+# concurrent 'start' pages, stitched with rank-continuity
+# checks; a token bucket holds every request to the allowed
+# request rate. weeks that fail are reported and left
+# missing, so the next run retries only those:
+requests_per_second = 1.0
+missing = cmcstore.missing_weeks(sun2021)
+if missing:
+    listings, achieved_rate, errors = scrape_listings(
+        missing,
+        max_coins=None,
+        requests_per_second=requests_per_second,
+        )
+    print("scraped %d weeks at %.2f requests/s"%(len(listings),achieved_rate))
+    if listings:
+        cmcstore.write_weeks(listings)
+    for week,error in errors.items():
+        print("%s not scraped: %s"%(week.strftime("%Y-%m-%d"),error))
+
+# the scrape store is the scrape's output; read it with
+# cmcstore.read_listings() or cmcstore.read_panel():
+print("scrape store holds %d weeks"%len(cmcstore.stored_weeks()))
@@ -14,13 +14,16 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 from styleguide import set_rcparams, imghelper
 
+# personal modules:
+from cmcstore import read_listings
+
 # pandas index slices:
 idx = pd.IndexSlice
 
 # -------------------------------------------------------
 # Market cap rank changes per month.
 # -------------------------------------------------------
-cmc_history = pd.read_hdf("bin/cmc-scrape-results-thru-2021-12-19.hdf")
+cmc_history = read_listings(end="2021-12-19",max_rank=2000)
 rankings = pd.read_hdf("bin/cmc-rank-histories-thru-2021-12-19.hdf")
 dmc_per_month = rankings.resample("4W"
     ).first(
@@ -0,0 +1,50 @@
+"""Sweep data-explorer.py's rank-jump screen over its parameters.
+
+Instead of re-running data-explorer.py by hand for each parameter set,
+every combination of the grid below is screened in a process pool
+(see cmcsweep.py). The table of parameter set, selected coin and
+summary statistics is written to bin/data-explorer-sweep.xlsx.
+"""
+import time
+import pandas as pd
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+from cmcfeatures import history_path
+from cmcsweep import parameter_grid, sweep_screens
+
+# -------------------------------------------------------
+# Read data.
+# -------------------------------------------------------
+thru_date = "2021-12-19"
+current_week = "2021-12-12"
+rankings = pd.read_hdf(history_path("cmc_rank",thru_date))
+prices = pd.read_hdf(history_path("price",thru_date))
+
+# -------------------------------------------------------
+# Sweep.
+# -------------------------------------------------------
+grid = parameter_grid(
+    cutoff=[-25,-50,-75,-100,-150,-200,-300],
+    window=["2W","4W","8W"],
+    top_rank=[25,50,100],
+    bottom_rank=[300,500,1000],
+    )
+
+# the pool re-imports this script on platforms that spawn
+# workers, so only the main process runs the sweep:
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    table = sweep_screens(rankings,prices,current_week,grid)
+    print("screened %d parameter sets in %.2f s"%(len(grid),time.perf_counter()-t0))
+
+    # number of selected coins per parameter set:
+    counts = table.groupby(level=[0,1,2,3]).size()
+    print(counts.unstack("window").fillna(0).astype(int))
+
+    # coins selected most often across the sweep:
+    print(table.index.get_level_values("coin").value_counts().head(20))
+    table.to_excel("bin/data-explorer-sweep.xlsx")
@@ -6,6 +6,14 @@ from subprocess import Popen, PIPE
 import time
 import matplotlib.pyplot as plt
 
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+import httpcache
+from cmcapi import listings_frame
+
 def scrape_cmc_historical(
     date,
     limit,
@@ -28,38 +36,14 @@ def scrape_cmc_historical(
         )
     query = "%s?%s"%(base_url,options)
     
-    # query via CURL:
-    cmd = ["curl",query]
-    p = Popen(cmd,stderr=PIPE,stdout=PIPE)
-    stdout,stderr = p.communicate()
-    
-    # return stdout:
-    return stdout
+    # query via CURL, through the on-disk response cache
+    # (see httpcache.py for the cache and replay modes):
+    return httpcache.cached_curl(query)
 
 def process_json(stdout):
-    output = json.loads(stdout)
-    data = output["data"]
-    frames = []
-    
-    # list comprehension for faster extraction:
-    [_process_data_entry(entry,frames) for entry in data]
-    
-    # concatenate results into a Pandas' dataframe 
-    # and return:
-    results = pd.concat(
-        frames,axis=1,
-        ).transpose(
-        ).set_index("name"
-        )
-    return results
-
-def _process_data_entry(entry,frames):
-    quote = entry["quote"]["USD"]
-    s = pd.Series(quote)
-    s["name"] = entry["name"]
-    s["symbol"] = entry["symbol"]
-    s["cmc_rank"] = entry["cmc_rank"]
-    frames.append(s)
+    # decode straight into typed columns, one pass
+    # per field (see cmcapi.py):
+    return listings_frame(stdout)
 
 
 
@@ -0,0 +1,74 @@
+"""Benchmark paged CMC listing fetches against a local stand-in API.
+
+Compares today's single limit=2000 request per week, a single request
+for the whole universe, and the paged fetch in cmcapi.py that splits
+each week into concurrent 'start' windows. Runs offline; 'latency'
+emulates the real API round trip and 'item_latency' the time it takes
+to build a response per coin.
+"""
+import os
+import time
+import pandas as pd
+
+# measure the network path, not the response cache:
+os.environ["PUBLISH0X_HTTP_CACHE"] = "off"
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+import cmcapi
+from standin import standinserver
+
+# benchmark parameters:
+number_of_weeks = 8
+number_of_coins = 8500
+latency = 0.3 #s
+item_latency = 100e-6 #s per coin
+requests_per_second = 50.0
+weeks = pd.date_range(start="2021-01-03",periods=number_of_weeks,freq="W-SUN")
+
+# -----------------------------------------------------
+# Run benchmark.
+# -----------------------------------------------------
+server = standinserver(latency=latency,item_latency=item_latency).start()
+server.number_of_coins = number_of_coins
+for week in weeks:
+    server.listings(week.strftime("%Y-%m-%d"))
+
+def single_request(limit):
+    bodies,_ = cmcapi.scrape_historical(
+        weeks,
+        limit=limit,
+        requests_per_second=requests_per_second,
+        api=server.cmc_api,
+        verbose=False,
+        )
+    return {x: cmcapi.listings_frame(y) for x,y in bodies.items()}
+
+def paged(page_limit, pages_in_flight):
+    listings,_,_ = cmcapi.scrape_listings(
+        weeks,
+        page_limit=page_limit,
+        pages_in_flight=pages_in_flight,
+        requests_per_second=requests_per_second,
+        api=server.cmc_api,
+        verbose=False,
+        )
+    return listings
+
+print("%d weeks, %d coins per week, %.0f ms + %.2f ms/coin latency, %.0f requests/s allowed"%(
+    number_of_weeks,number_of_coins,latency*1e3,item_latency*1e3,requests_per_second))
+for name,scrape in [
+    ("limit=2000, one request",lambda: single_request(2000)),
+    ("whole universe, one request",lambda: single_request(number_of_coins)),
+    ("pages of 2000, 5 in flight",lambda: paged(2000,5)),
+    ("pages of 1000, 9 in flight",lambda: paged(1000,9)),
+    ]:
+    t0 = time.perf_counter()
+    listings = scrape()
+    elapsed = time.perf_counter() - t0
+    coins = min(len(x) for x in listings.values())
+    print("%-28s %6.2f s %6d coins per week"%(name,elapsed,coins))
+server.stop()
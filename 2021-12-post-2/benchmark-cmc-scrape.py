@@ -0,0 +1,72 @@
+"""Benchmark the weekly CMC scrape against a local stand-in API.
+
+Compares the original loop (one request per week followed by a
+fixed pause) with the concurrent scraper in cmcapi.py, whose token
+bucket enforces the same request rate. Runs offline; 'latency'
+emulates the time the real API takes to answer a listings request.
+"""
+import os
+import time
+import pandas as pd
+
+# measure the network path, not the response cache:
+os.environ["PUBLISH0X_HTTP_CACHE"] = "off"
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+import cmcapi
+from standin import standinserver
+from webclient import connectionpool
+
+# benchmark parameters:
+number_of_weeks = 30
+number_of_coins = 2000
+latency = 0.3 #s
+requests_per_second = 4.0
+weeks = pd.date_range(start="2021-01-03",periods=number_of_weeks,freq="W-SUN")
+
+# -----------------------------------------------------
+# Baseline: sequential requests with a fixed pause.
+# -----------------------------------------------------
+def sequential_scrape(api):
+    pool = connectionpool(api,maxsize=1)
+    bodies = {}
+    for week in weeks:
+        bodies[week] = pool.get(cmcapi.historical_url(week,number_of_coins,api=api))
+        time.sleep(1.0/requests_per_second)
+    pool.close()
+    return bodies
+
+# -----------------------------------------------------
+# Run benchmark.
+# -----------------------------------------------------
+server = standinserver(latency=latency).start()
+server.number_of_coins = number_of_coins
+for week in weeks:
+    server.listings(week.strftime("%Y-%m-%d"))
+
+print("%d weeks, %d coins per week, %.0f ms latency, %.1f requests/s allowed"%(
+    number_of_weeks,number_of_coins,latency*1e3,requests_per_second))
+t0 = time.perf_counter()
+bodies = sequential_scrape(server.cmc_api)
+elapsed = time.perf_counter() - t0
+print("%-24s %6.2f s %6.2f requests/s"%(
+    "sequential + pause",elapsed,number_of_weeks/elapsed))
+for max_in_flight in [2,4,8]:
+    t0 = time.perf_counter()
+    bodies, achieved_rate = cmcapi.scrape_historical(
+        weeks,
+        limit=number_of_coins,
+        requests_per_second=requests_per_second,
+        max_in_flight=max_in_flight,
+        api=server.cmc_api,
+        verbose=False,
+        )
+    elapsed = time.perf_counter() - t0
+    assert len(bodies) == number_of_weeks
+    print("%-24s %6.2f s %6.2f requests/s"%(
+        "token bucket, %d in flight"%max_in_flight,elapsed,achieved_rate))
+server.stop()
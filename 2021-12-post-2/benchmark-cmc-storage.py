@@ -0,0 +1,73 @@
+"""Benchmark loading of stored CMC scrape panels.
+
+Compares the original cmc-scrape-results HDF layout (object-dtype
+columns out of the old process_json) with the compact typed scrape
+store in cmcstore.py, on a synthetic panel. Load time and resident
+memory of the loaded frame are reported.
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import numpy as np
+import pandas as pd
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+import cmcstore
+from cmcapi import listings_frame
+from standin import synthetic_listings
+
+# the object-dtype layout is pickled by PyTables, which is
+# what this benchmark measures:
+warnings.simplefilter("ignore",pd.errors.PerformanceWarning)
+
+# benchmark parameters:
+number_of_weeks = 100
+number_of_coins = 2000
+repeats = 3
+weeks = pd.date_range(start="2020-01-05",periods=number_of_weeks,freq="W-SUN")
+
+# -----------------------------------------------------
+# Write both layouts.
+# -----------------------------------------------------
+temp_dir = tempfile.mkdtemp()
+store = os.path.join(temp_dir,"cmc")
+hdf_fi = os.path.join(temp_dir,"cmc-scrape-results.hdf")
+listings = {
+    week: listings_frame(json.dumps(
+        {"data": synthetic_listings(week,number_of_coins)}))
+    for week in weeks
+    }
+cmcstore.write_weeks(listings,store=store)
+
+# the old process_json returned every column as objects,
+# without the coin id:
+frames = [df.drop(columns="id").astype(object) for df in listings.values()]
+pd.concat(frames,keys=weeks).to_hdf(hdf_fi,key="w",mode="w")
+
+# -----------------------------------------------------
+# Run benchmark.
+# -----------------------------------------------------
+print("%d weeks of %d coins"%(number_of_weeks,number_of_coins))
+results = {}
+for name,load in [
+    ("object-dtype HDF",lambda: pd.read_hdf(hdf_fi)),
+    ("compact store",lambda: cmcstore.read_listings(store=store)),
+    ]:
+    best = np.inf
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        df = load()
+        best = min(best,time.perf_counter()-t0)
+    memory = df.memory_usage(deep=True).sum() + df.index.memory_usage(deep=True)
+    results[name] = (best,memory)
+    print("%-18s load %6.3f s, memory %7.1f MB"%(name,best,memory/1e6))
+(t0,m0),(t1,m1) = results.values()
+print("reduction: load %.1fx, memory %.1fx"%(t0/t1,m0/m1))
+shutil.rmtree(temp_dir)
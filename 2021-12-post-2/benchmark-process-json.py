@@ -0,0 +1,87 @@
+"""Benchmark decoding of CMC listings responses.
+
+Compares the original process_json (one pd.Series per coin, then an
+object-dtype concat and transpose) with the columnar decoder in
+cmcapi.py on synthetic 5000-coin payloads.
+"""
+import json
+import time
+import numpy as np
+import pandas as pd
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+from cmcapi import listings_frame
+from standin import synthetic_listings
+
+# benchmark parameters:
+number_of_coins = 5000
+number_of_weeks = 4
+repeats = 3
+weeks = pd.date_range(start="2021-01-03",periods=number_of_weeks,freq="W-SUN")
+
+# -----------------------------------------------------
+# Baseline: the original process_json.
+# -----------------------------------------------------
+def original_process_json(stdout):
+    output = json.loads(stdout)
+    data = output["data"]
+    frames = []
+    [_process_data_entry(entry,frames) for entry in data]
+    results = pd.concat(
+        frames,axis=1,
+        ).transpose(
+        ).set_index("name"
+        )
+    return results
+
+def _process_data_entry(entry,frames):
+    quote = entry["quote"]["USD"]
+    s = pd.Series(quote)
+    s["name"] = entry["name"]
+    s["symbol"] = entry["symbol"]
+    s["cmc_rank"] = entry["cmc_rank"]
+    frames.append(s)
+
+# -----------------------------------------------------
+# Run benchmark.
+# -----------------------------------------------------
+payloads = [
+    json.dumps({"data": synthetic_listings(x,number_of_coins)}).encode()
+    for x in weeks
+    ]
+
+# both decoders must agree (the original drops the coin id):
+original = original_process_json(payloads[0])
+columnar = listings_frame(payloads[0]).drop(columns="id")
+pd.testing.assert_frame_equal(
+    original.infer_objects(),
+    columnar,
+    check_dtype=False,
+    check_index_type=False,
+    )
+
+print("%d weeks of %d coins"%(number_of_weeks,number_of_coins))
+timings = {}
+for name,decode in [
+    ("original process_json",original_process_json),
+    ("columnar listings_frame",listings_frame),
+    ]:
+    best = np.inf
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for payload in payloads:
+            decode(payload)
+        best = min(best,time.perf_counter()-t0)
+    timings[name] = best
+    print("%-24s %7.3f s %9.0f coins/s"%(
+        name,best,number_of_weeks*number_of_coins/best))
+print("speedup: %.1fx"%(
+    timings["original process_json"]/timings["columnar listings_frame"]))
+print("memory, original: %.1f MB, columnar: %.1f MB"%(
+    original.memory_usage(deep=True).sum()/1e6,
+    columnar.memory_usage(deep=True).sum()/1e6,
+    ))
@@ -0,0 +1,101 @@
+"""Benchmark building week x coin history matrices from the scrape panel.
+
+Compares the per-coin loop data-setup.py used to fill its rank
+history frame with the single pivot in cmcfeatures.py, on a synthetic
+panel where coins list and delist over time. The loop only builds
+ranks; the pivot builds rank, price and market cap together.
+"""
+import time
+import numpy as np
+import pandas as pd
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+from cmcfeatures import history_matrices
+
+# benchmark parameters:
+number_of_weeks = 500
+number_of_coins = 10000
+loop_coins = 1000 #the loop is timed on a subset and scaled up
+seed = 0
+
+# -----------------------------------------------------
+# Build a synthetic scrape panel.
+# -----------------------------------------------------
+# each coin is listed over one contiguous run of weeks:
+rng = np.random.default_rng(seed)
+weeks = pd.date_range(start="2012-06-03",periods=number_of_weeks,freq="W-SUN")
+names = np.array(["Coin %d"%i for i in range(number_of_coins)])
+first = rng.integers(0,number_of_weeks,number_of_coins)
+last = np.minimum(first+rng.integers(1,number_of_weeks,number_of_coins),number_of_weeks)
+listed = (np.arange(number_of_weeks)[:,None] >= first) & (np.arange(number_of_weeks)[:,None] < last)
+week_id,coin_id = np.nonzero(listed)
+
+# rank by a random market cap within each week:
+market_cap = rng.lognormal(15,3,len(week_id))
+order = np.lexsort((-market_cap,week_id))
+week_id,coin_id,market_cap = week_id[order],coin_id[order],market_cap[order]
+starts = np.searchsorted(week_id,np.arange(number_of_weeks))
+cmc_rank = np.arange(len(week_id)) - starts[week_id] + 1
+mdf = pd.DataFrame(
+    {
+        "cmc_rank": cmc_rank,
+        "price": market_cap/rng.lognormal(18,2,len(week_id)),
+        "market_cap": market_cap,
+        },
+    index=pd.MultiIndex.from_arrays(
+        [weeks[week_id],names[coin_id]],
+        names=[None,"name"],
+        ),
+    )
+
+# -----------------------------------------------------
+# Original per-coin loop.
+# -----------------------------------------------------
+def loop_rankings(mdf, columns):
+    rankings = pd.DataFrame(
+        np.nan,
+        index=mdf.index.levels[0],
+        columns=columns,
+        )
+    coins = mdf.reset_index(level=0).sort_index()
+    coins = coins.rename(columns={"level_0": "week"})
+    for col in rankings.columns:
+        data = coins.loc[col,["week","cmc_rank"]]
+        if len(data.shape) < 2:
+            rows = data.week
+            entries = data.cmc_rank
+        else:
+            rows = data.week.tolist()
+            entries = data.cmc_rank.values
+        rankings.loc[rows,col] = entries
+    return rankings
+
+# -----------------------------------------------------
+# Run benchmark.
+# -----------------------------------------------------
+print("%d weeks x %d coins, %d panel rows"%(number_of_weeks,number_of_coins,len(mdf)))
+
+t0 = time.perf_counter()
+histories = history_matrices(mdf)
+pivot = time.perf_counter() - t0
+print("%-34s %8.2f s"%("pivot, rank + price + market cap",pivot))
+
+all_coins = mdf.index.get_level_values(1).unique()
+t0 = time.perf_counter()
+rankings = loop_rankings(mdf,all_coins[:loop_coins])
+loop = (time.perf_counter()-t0)*number_of_coins/loop_coins
+print("%-34s %8.2f s (%d coins timed, scaled)"%("per-coin loop, rank only",loop,loop_coins))
+print("speedup: %.0fx"%(loop/pivot))
+
+# both give the same ranks:
+pd.testing.assert_frame_equal(
+    rankings,
+    histories["cmc_rank"][rankings.columns],
+    check_names=False,
+    check_index_type=False,
+    check_column_type=False,
+    )
@@ -15,13 +15,17 @@ from matplotlib.backends.backend_pdf import PdfPages
 from styleguide import set_rcparams, add_markings, imghelper
 set_rcparams()
 
+# personal modules:
+from cmcstore import read_listings
+from cmcfeatures import load_rank_deltas
+
 # pandas index slices:
 idx = pd.IndexSlice
 
 # -------------------------------------------------------
 # Read data.
 # -------------------------------------------------------
-cmc_history = pd.read_hdf("bin/cmc-scrape-results-thru-2021-12-19.hdf")
+cmc_history = read_listings(end="2021-12-19",max_rank=2000)
 rankings = pd.read_hdf("bin/cmc-rank-histories-thru-2021-12-19.hdf")
 coins_of_interest = pd.read_excel(
     "coins-of-interest.xlsx",
@@ -34,29 +38,15 @@ coins_of_interest = coins_of_interest.sort_values(
     ascending=False,
     )
 
-# market cap ranks every first Sunday of the month:
-mcr_first_sunday = rankings[~rankings.index.to_period("m").duplicated()]
-
-# market cap rank changes per month:
-dmcr_per_month = mcr_first_sunday.diff()
-
-# market cap rank change percent per month:
-mcr_first_sunday_shift = mcr_first_sunday.copy()
-new_index = mcr_first_sunday.index.tolist()
-mcr_first_sunday_shift.index = new_index[1:] + ["dropme"]
-dmcr_per_month_p = dmcr_per_month / mcr_first_sunday_shift
-dmcr_per_month_p = dmcr_per_month_p.iloc[:-1]
-dmcr_per_month_p.index = pd.to_datetime(dmcr_per_month_p.index)
-
-# market cap rank changes per week, and percent change
-# per week:
-dmcr_per_week = rankings.diff()
-rankings_shift = rankings.copy()
-new_rankings_index = rankings.index.tolist()
-rankings_shift.index = new_rankings_index[1:] + ["dropme"]
-dmcr_per_week_p = dmcr_per_week / rankings_shift
-dmcr_per_week_p = dmcr_per_week_p[:-1]
-dmcr_per_week_p.index = pd.to_datetime(dmcr_per_week_p.index)
+# weekly and monthly (first Sunday to first Sunday) market
+# cap rank changes, absolute and relative to the previous
+# rank; computed once per rankings version and cached in
+# the feature store (see cmcfeatures.py):
+rank_deltas = load_rank_deltas(rankings)
+dmcr_per_week = rank_deltas["dmcr_per_week"]
+dmcr_per_week_p = rank_deltas["dmcr_per_week_p"]
+dmcr_per_month = rank_deltas["dmcr_per_month"]
+dmcr_per_month_p = rank_deltas["dmcr_per_month_p"]
 
 # restrict rankings to 2021:
 rankings2021 = rankings.loc["2021-01-01":].copy()
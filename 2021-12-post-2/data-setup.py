@@ -6,14 +6,25 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+from cmcstore import read_panel
+from cmcfeatures import history_matrices, history_path, load_rank_deltas
+
 # Pandas' index slices:
 idx = pd.IndexSlice
 
 # -------------------------------------------------------
 # Load and process data.
 # -------------------------------------------------------
-scrape_file = "bin/cmc-scrape-results-thru-2021-12-19.hdf"
-mdf = pd.read_hdf(scrape_file)
+# the top 2000 coins of every week through 2021-12-19, read
+# compactly typed from the scrape store (see cmcstore.py),
+# one row per week and coinmarketcap coin:
+thru_date = "2021-12-19"
+mdf = read_panel(end=thru_date,max_rank=2000)
 
 # get current coin market cap rankings and remove 
 # stablecoins, wrapped coins, and memecoins:
@@ -44,49 +55,17 @@ ignore_coins = [
     "Dogelon Mars",
     ]
 
-# get unique coin names, and exclude the coins 
-# we don't care about:
-unique_coins = mdf.reset_index(level=1)["name"].unique()
-unique_coins = [x for x in unique_coins if x not in ignore_coins]
-
 # -------------------------------------------------------
-# Extract coin rank histories.
+# Extract coin rank, price and market cap histories.
 # -------------------------------------------------------
-# create empty dataframe for rank results:
-rankings = pd.DataFrame(
-    np.nan,
-    index=mdf.index.levels[0],
-    columns=unique_coins,    
-    )
-
-# create dataframe from multiindex scraped data 
-# that is indexed by coin name:
-coins = mdf.reset_index(level=0).sort_index()
-coins = coins.rename(
-    columns={"level_0": "week"},
-    )
-
-# extract rank over time:
-for col in rankings.columns:
-    data = coins.loc[col,["week","cmc_rank"]]
-    if len(data.shape) < 2:
-        rows = data.week
-        entries = data.cmc_rank
-    else:
-        rows = data.week.tolist()
-        entries = data.cmc_rank.values
-    rankings.loc[rows,col] = entries
-
-# save rank history data:
-thru_date = scrape_file.split("thru-")[-1].split(".hdf")[0]
-results_fi = "cmc-rank-histories-thru-%s.hdf"%thru_date
-rankings.to_hdf("bin/%s"%results_fi,"w",mode="w")
-
-
-
-
-
-
-
+# one pivot of the scrape panel gives week x coin matrices
+# of every field, without the coins we don't care about:
+histories = history_matrices(mdf,exclude=ignore_coins)
+rankings = histories["cmc_rank"]
 
+# save history data:
+for field,df in histories.items():
+    df.to_hdf(history_path(field,thru_date),"w",mode="w")
 
+# fill the rank-delta feature store for the analysis scripts:
+load_rank_deltas(rankings)
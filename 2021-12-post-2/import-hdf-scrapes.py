@@ -0,0 +1,52 @@
+"""Copy the cmc-scrape-results HDF files of every post directory
+into the scrape store (see cmcstore.py).
+
+Weeks the store already holds are skipped, so scrape-cmc.py only
+requests the weeks none of the files have.
+"""
+import glob
+import os
+import pandas as pd
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+import cmcstore
+from cmcapi import scrape_listings
+
+# find every scrape saved by the posts' scrape-cmc.py
+# scripts, largest (most coins per week) first:
+hdf_files = sorted(
+    glob.glob("%s/*/cmc-scrape-results*.hdf"%cmcstore.REPO_DIR)
+    + glob.glob("%s/*/bin/cmc-scrape-results*.hdf"%cmcstore.REPO_DIR),
+    key=os.path.getsize,
+    reverse=True,
+    )
+
+# the old files have no coinmarketcap coin ids. scraping
+# their first and last weeks (a few requests, capped at the
+# files' coins per week) gives the ids of most of their
+# coins, looked up by name and symbol. the scraped weeks
+# only lend their ids; every week is imported from the
+# files, so all of them hold the same universe:
+weeks = set()
+max_coins = 0
+for hdf_fi in hdf_files:
+    coins_per_week = pd.read_hdf(hdf_fi).groupby(level=0).size()
+    weeks.update(coins_per_week.index)
+    max_coins = max(max_coins,int(coins_per_week.max()))
+weeks = sorted(weeks)
+coin_ids = None
+missing = cmcstore.missing_weeks(weeks[:1] + weeks[-1:])
+if missing:
+    listings, achieved_rate, errors = scrape_listings(
+        missing,max_coins=max_coins,requests_per_second=1.0)
+    if listings:
+        coin_ids = cmcstore.listings_coin_ids(listings)
+
+for hdf_fi in hdf_files:
+    imported = cmcstore.import_hdf_scrape(hdf_fi,coin_ids=coin_ids)
+    print("%s -> %d weeks"%(hdf_fi,len(imported)))
+print("scrape store holds %d weeks"%len(cmcstore.stored_weeks()))
@@ -33,6 +33,9 @@ from matplotlib.backends.backend_pdf import PdfPages
 from styleguide import set_rcparams, add_markings, imghelper
 set_rcparams()
 
+# personal modules:
+from cmcfeatures import load_rank_deltas
+
 # pandas index slices:
 idx = pd.IndexSlice
 
@@ -53,15 +56,12 @@ coins_of_interest = coins_of_interest.sort_values(
 # -------------------------------------------------------
 # Rank change calculations.
 # -------------------------------------------------------
-# market cap rank changes per week, and percent change
-# per week:
-dmcr_per_week = rankings.diff()
-rankings_shift = rankings.copy()
-new_rankings_index = rankings.index.tolist()
-rankings_shift.index = new_rankings_index[1:] + ["dropme"]
-dmcr_per_week_p = dmcr_per_week / rankings_shift
-dmcr_per_week_p = dmcr_per_week_p[:-1]
-dmcr_per_week_p.index = pd.to_datetime(dmcr_per_week_p.index)
+# market cap rank changes per week, absolute and relative
+# to the previous rank; computed once per rankings version
+# and cached in the feature store (see cmcfeatures.py):
+rank_deltas = load_rank_deltas(rankings)
+dmcr_per_week = rank_deltas["dmcr_per_week"]
+dmcr_per_week_p = rank_deltas["dmcr_per_week_p"]
 
 # restrict rankings to 2021:
 rankings2021 = rankings.loc["2021-01-01":].copy()
@@ -13,35 +13,33 @@ from matplotlib.backends.backend_pdf import PdfPages
 from styleguide import set_rcparams, add_markings, imghelper
 set_rcparams()
 
+# personal modules:
+import govstore
+from govstore import read_snapshot
+from govstats import slice_summary, describe_sheet
+
 # pandas index slices:
 idx = pd.IndexSlice
 
 # -----------------------------------------------------
 # Data read and extraction.
 # -----------------------------------------------------
-# read data:
-gov1 = pd.read_hdf("bin/2022-01-15-algorand-governance-period-1.hdf")
-gov2 = pd.read_hdf("bin/2022-01-15-algorand-governance-period-2.hdf")
+# read data from the governance store:
+gov1 = read_snapshot(1,"2022-01-15")
+gov2 = read_snapshot(2,"2022-01-15")
 
 # extract eligible accounts:
 gov1_eligible = gov1[gov1.eligible==True].copy()
 gov2_eligible = gov2[gov2.eligible==True].copy()
 
-# overlap:
-overlap = gov2.merge(
-    gov1,
-    on="address",
-    suffixes=("gov2","gov1"),
-    )
-overlap_eligible = gov2.merge(
-    gov1_eligible,
-    on="address",
-    suffixes=("gov2","gov1"),
-    )
+# overlap, as sorted arrays of the integer address ids
+# shared by every governance period:
+overlap = govstore.overlap(gov2.address_id,gov1.address_id)
+overlap_eligible = govstore.overlap(gov2.address_id,gov1_eligible.address_id)
 
 # set indices:
-gov1 = gov1.set_index("address",drop=False)
-gov2 = gov2.set_index("address",drop=False)
+gov1 = gov1.set_index("address_id")
+gov2 = gov2.set_index("address_id")
 
 # calculate each account's committed algo percentage 
 # of the total committed Algo per governance period:
@@ -59,34 +57,42 @@ gov2_eligible["committed_ratio"] = (
 # -----------------------------------------------------
 # By-the-numbers.
 # -----------------------------------------------------
+# summarize every slice of a period in one pass:
+summaries = []
+for gov in [gov1, gov2]:
+    eligible = gov.eligible.to_numpy(dtype=bool)
+    gt1 = gov.committed_algos.to_numpy() > 1.0
+    summaries.append(slice_summary(
+        gov,
+        {
+            "all": np.ones(len(gov),dtype=bool),
+            "only eligible": eligible,
+            "gt1 all": gt1,
+            "gt1 only eligible": gt1 & eligible,
+            },
+        columns=["committed_algos","committed_ratio"],
+        ))
+
 # open excel file:
 with pd.ExcelWriter("bin/governance.xlsx") as writer:
     
-    # extract data per period:
-    for period_id,gov in enumerate([gov1, gov2]):
-        frames = []
-        eligible_gov = gov[gov.eligible==True]
-        for df in [gov, eligible_gov]:
-            f = df.describe()
-            f["sum"] = df.committed_algos.sum()
-            frames.append(f)
-        
-        # save data per period to different sheets
-        # of the same excel file:
-        results = pd.concat(frames,keys=["all","only eligible"])
+    # save data per period to different sheets
+    # of the same excel file:
+    for period_id,summary in enumerate(summaries):
+        results = describe_sheet(
+            summary,
+            ["all","only eligible"],
+            )
         results.to_excel(writer,sheet_name="period %d summary"%(period_id+1))
     
-    # do the same data extraction, but this time ignore
+    # the same summaries, but this time ignoring
     # addresses with less than 1.0 Algo:
-    for period_id,gov in enumerate([gov1, gov2]):
-        frames = []
-        gov_lt1 = gov[gov.committed_algos>1.0]
-        eligible_gov = gov_lt1[gov_lt1.eligible==True]
-        for df in [gov_lt1, eligible_gov]:
-            f = df.describe()
-            f["sum"] = df.committed_algos.sum()
-            frames.append(f)
-        results = pd.concat(frames,keys=["all","only eligible"])
+    for period_id,summary in enumerate(summaries):
+        results = describe_sheet(
+            summary,
+            ["gt1 all","gt1 only eligible"],
+            keys=["all","only eligible"],
+            )
         results.to_excel(writer,sheet_name="period %d summary gt 1Algo"%(period_id+1))
 
 # -----------------------------------------------------
@@ -272,12 +278,12 @@ plt.close()
 # all overlap:
 fig,ax = plt.subplots()
 plt.scatter(
-    gov1.loc[overlap.address,"committed_algos"]/1e6,
-    gov2.loc[overlap.address,"committed_algos"]/1e6,
+    gov1.loc[overlap,"committed_algos"]/1e6,
+    gov2.loc[overlap,"committed_algos"]/1e6,
     edgecolor="black",
     facecolor="none",
     s=200,
-    label="overlap addresses\n(%d total)"%(len(overlap.address)),
+    label="overlap addresses\n(%d total)"%(len(overlap)),
     )
 #plt.plot(
 #    [0,20],
@@ -297,12 +303,12 @@ plt.close()
 # all overlap, excluding the largest period 1 whale:
 fig,ax = plt.subplots()
 plt.scatter(
-    gov1.loc[overlap.address,"committed_algos"]/1e6,
-    gov2.loc[overlap.address,"committed_algos"]/1e6,
+    gov1.loc[overlap,"committed_algos"]/1e6,
+    gov2.loc[overlap,"committed_algos"]/1e6,
     edgecolor="black",
     facecolor="none",
     s=200,
-    label="overlap addresses\n(%d total)"%(len(overlap.address)),
+    label="overlap addresses\n(%d total)"%(len(overlap)),
     )
 plt.plot(
     [0,20],
@@ -322,12 +328,12 @@ plt.close()
 # overlap of accounts that remained eligible in gov. period 1:
 fig,ax = plt.subplots()
 plt.scatter(
-    gov1.loc[overlap_eligible.address,"committed_algos"]/1e6,
-    gov2.loc[overlap_eligible.address,"committed_algos"]/1e6,
+    gov1.loc[overlap_eligible,"committed_algos"]/1e6,
+    gov2.loc[overlap_eligible,"committed_algos"]/1e6,
     edgecolor="black",
     facecolor="none",
     s=200,
-    label="gov.1 eligible overlap addresses\n(%d total)"%(len(overlap_eligible.address)),
+    label="gov.1 eligible overlap addresses\n(%d total)"%(len(overlap_eligible)),
     )
 plt.plot(
     [0,20],
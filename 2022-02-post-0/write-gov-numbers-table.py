@@ -1,17 +1,28 @@
 import numpy as np
 import pandas as pd
 
-# read data:
-gov_period2 = pd.read_hdf("bin/2022-02-02-algorand-governance-period-2.hdf")
-gov_period1 = pd.read_hdf("bin/2022-01-15-algorand-governance-period-1.hdf")
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
 
-# extract eligible accounts:
-gov_period2 = gov_period2[gov_period2.eligible==True].copy()
-gov_period1 = gov_period1[gov_period1.eligible==True].copy()
+# personal modules:
+from govstore import read_snapshot
 
-# set indices:
-gov_period2 = gov_period2.set_index("address",drop=False)
-gov_period1 = gov_period1.set_index("address",drop=False)
+# read eligible accounts from the governance store; the
+# eligibility filter and column selection are pushed down
+# to the store so only the rows and columns used are read:
+gov_period2 = read_snapshot(
+    2,
+    "2022-02-02",
+    columns=["address","committed_algos"],
+    eligible=True,
+    ).set_index("address",drop=False)
+gov_period1 = read_snapshot(
+    1,
+    "2022-01-15",
+    columns=["address","committed_algos"],
+    eligible=True,
+    ).set_index("address",drop=False)
 
 # exract committed algos count:
 p1_algos = gov_period1.committed_algos.sum()/1e6
@@ -13,23 +13,30 @@ from matplotlib.backends.backend_pdf import PdfPages
 from styleguide import set_rcparams, add_markings, imghelper
 set_rcparams()
 
+# personal modules:
+from govstore import read_snapshot
+
 # pandas index slices:
 idx = pd.IndexSlice
 
 # -----------------------------------------------------
 # Data read and extraction.
 # -----------------------------------------------------
-# read data:
-gov_period2 = pd.read_hdf("bin/2022-02-09-algorand-governance-period-2.hdf")
-gov_period1 = pd.read_hdf("bin/2022-01-15-algorand-governance-period-1.hdf")
-
-# extract eligible accounts:
-gov_period2_eligible = gov_period2[gov_period2.eligible==True].copy()
-gov_period1_eligible = gov_period1[gov_period1.eligible==True].copy()
-
-# set indices:
-gov_period2 = gov_period2.set_index("address",drop=False)
-gov_period1 = gov_period1.set_index("address",drop=False)
+# read eligible accounts from the governance store; the
+# eligibility filter and column selection are pushed down
+# to the store so only the rows and columns used are read:
+gov_period2_eligible = read_snapshot(
+    2,
+    "2022-02-09",
+    columns=["address","committed_algos"],
+    eligible=True,
+    )
+gov_period1_eligible = read_snapshot(
+    1,
+    "2022-01-15",
+    columns=["address","committed_algos"],
+    eligible=True,
+    )
 
 # -----------------------------------------------------
 # Plot setup.
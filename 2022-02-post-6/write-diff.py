@@ -2,17 +2,28 @@
 import numpy as np
 import pandas as pd
 
-# read data:
-gov_last = pd.read_hdf("bin/2022-02-16-algorand-governance-period-2.hdf")
-gov_current = pd.read_hdf("bin/2022-02-23-algorand-governance-period-2.hdf")
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
 
-# extract eligible accounts:
-gov_last = gov_last[gov_last.eligible==True].copy()
-gov_current = gov_current[gov_current.eligible==True].copy()
+# personal modules:
+from govstore import read_snapshot
 
-# set indices:
-gov_last = gov_last.set_index("address",drop=False)
-gov_current = gov_current.set_index("address",drop=False)
+# read eligible accounts from the governance store; the
+# eligibility filter and column selection are pushed down
+# to the store so only the rows and columns used are read:
+gov_last = read_snapshot(
+    2,
+    "2022-02-16",
+    columns=["address","committed_algos"],
+    eligible=True,
+    ).set_index("address",drop=False)
+gov_current = read_snapshot(
+    2,
+    "2022-02-23",
+    columns=["address","committed_algos"],
+    eligible=True,
+    ).set_index("address",drop=False)
 
 # exract committed algos count:
 current_algos = gov_current.committed_algos.sum()/1e6
@@ -0,0 +1,84 @@
+"""Benchmark governor page fetching against a local stand-in API.
+
+Compares the original one-curl-process-per-page loop with the pooled
+keep-alive fetcher in govapi.py, sequentially and with several pages
+in flight. Runs offline; 'latency' emulates the real API round trip.
+"""
+import json
+import os
+import shutil
+import time
+from subprocess import Popen, PIPE
+
+# measure the network path, not the response cache:
+os.environ["PUBLISH0X_HTTP_CACHE"] = "off"
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+import govapi
+from standin import standinserver, synthetic_governors
+
+# benchmark parameters:
+number_of_governors = 20000
+latency = 0.02 #s
+governance_period = 2
+
+# -----------------------------------------------------
+# Baseline: one curl process per page.
+# -----------------------------------------------------
+def curl_fetch(api):
+    data_list = []
+    current_page = 0
+    while True:
+        url = govapi.governors_url(governance_period,current_page*100,api=api)
+        cmd = [
+            "curl",
+            "--silent",
+            url,
+            "--header",
+            "Accept: application/json",
+            "--header",
+            "Content-Type: application/json",
+            ]
+        p = Popen(cmd,stdout=PIPE,stderr=PIPE)
+        stdout,stderr = p.communicate()
+        results = json.loads(stdout)["results"]
+        data_list += results
+        if len(results) < 100:
+            break
+        current_page += 1
+    return data_list
+
+# -----------------------------------------------------
+# Run benchmark.
+# -----------------------------------------------------
+server = standinserver(latency=latency).start()
+server.governors[governance_period] = synthetic_governors(number_of_governors)
+pages = number_of_governors//100 + 1
+
+cases = []
+if shutil.which("curl"):
+    cases.append(("curl per page", lambda: curl_fetch(server.governance_api)))
+for max_in_flight in [1,4,8,16]:
+    cases.append((
+        "pooled, %d in flight"%max_in_flight,
+        lambda n=max_in_flight: govapi.fetch_governors(
+            governance_period,
+            max_in_flight=n,
+            api=server.governance_api,
+            verbose=False,
+            ),
+        ))
+
+print("%d governors, %d pages, %.0f ms latency per request"%(
+    number_of_governors,pages,latency*1e3))
+for name,fetch in cases:
+    t0 = time.perf_counter()
+    governors = fetch()
+    elapsed = time.perf_counter() - t0
+    assert len(governors) == number_of_governors
+    print("%-22s %7.2f s %8.1f pages/s"%(name,elapsed,pages/elapsed))
+server.stop()
@@ -0,0 +1,93 @@
+"""Benchmark decoding of governor 'results' pages into a dataframe.
+
+Compares the original path (one python list per governor, then
+.apply(float) and pd.to_datetime over the whole frame) with the typed
+column decoder in govapi.py, on synthetic pages of 100 governors.
+"""
+import time
+import pandas as pd
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+import govapi
+from standin import synthetic_governors
+
+# benchmark parameters:
+number_of_governors = 80000
+repeats = 5
+
+# split synthetic governors into api pages:
+governors = synthetic_governors(number_of_governors)
+pages = [governors[i:i+100] for i in range(0,number_of_governors,100)]
+
+# -----------------------------------------------------
+# Original decoding path.
+# -----------------------------------------------------
+def extract_governor_data(
+    results_item,
+    data_list,
+    ):
+    address = results_item["account"]["address"]
+    committed_algos = results_item["committed_algo_amount"]
+    eligible_flag = results_item["is_eligible"]
+    registration_datetime = results_item["registration_datetime"]
+    data_list.append([
+        address, #wallet public address
+        registration_datetime, #datetime Zulu (UTC)
+        committed_algos, #micro-algos
+        eligible_flag, #governance eligibility 
+        ])
+
+def original_decode(pages):
+    data_list = []
+    for results in pages:
+        [extract_governor_data(x,data_list) for x in results]
+    df = pd.DataFrame(
+        data_list,
+        columns=[
+            "address",
+            "registration",
+            "committed_algos",
+            "eligible",
+            ],
+        )
+    df["committed_algos"] = df.committed_algos.apply(float)/1e6
+    df["registration"] = pd.to_datetime(df.registration)
+    return df
+
+# -----------------------------------------------------
+# Typed column decoding.
+# -----------------------------------------------------
+def typed_decode(pages):
+    columns = govapi.governorcolumns()
+    for results in pages:
+        columns.extend(results)
+    return columns.to_frame()
+
+# -----------------------------------------------------
+# Run benchmark.
+# -----------------------------------------------------
+def best_of(decode):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        df = decode(pages)
+        times.append(time.perf_counter()-t0)
+    return min(times), df
+
+t_original, df_original = best_of(original_decode)
+t_typed, df_typed = best_of(typed_decode)
+
+# both paths must produce the same snapshot:
+pd.testing.assert_frame_equal(
+    df_original.astype({"address": str}),
+    df_typed.astype({"address": str}),
+    check_dtype=False,
+    )
+print("%d governors in %d pages (best of %d)"%(
+    number_of_governors,len(pages),repeats))
+print("original: %.3f s"%t_original)
+print("typed:    %.3f s (%.1fx)"%(t_typed,t_original/t_typed))
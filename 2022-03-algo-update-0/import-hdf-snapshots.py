@@ -0,0 +1,25 @@
+"""Copy the dated governance HDF files of every post directory
+into the partitioned governance store (see govstore.py).
+
+Existing partitions with the same period and date are replaced.
+"""
+import glob
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+import govstore
+
+# find every governance snapshot saved by the posts'
+# query-governance-api.py scripts:
+hdf_files = sorted(glob.glob(
+    "%s/*/bin/????-??-??-algorand-governance-period-*.hdf"%govstore.REPO_DIR))
+for hdf_fi in hdf_files:
+    output_fi = govstore.import_hdf_snapshot(hdf_fi)
+    print("%s -> %s"%(hdf_fi,output_fi))
+
+# backfill metrics rows and sketches of partitions written
+# without them:
+govstore.refresh_metrics()
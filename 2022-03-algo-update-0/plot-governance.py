@@ -13,23 +13,31 @@ from matplotlib.backends.backend_pdf import PdfPages
 from styleguide import set_rcparams, add_markings, imghelper
 set_rcparams()
 
+# personal modules:
+from govstore import read_snapshot
+from concentration import concentration, concentration_table, whaletracker
+
 # pandas index slices:
 idx = pd.IndexSlice
 
 # -----------------------------------------------------
 # Data read and extraction.
 # -----------------------------------------------------
-# read data:
-gov_period2 = pd.read_hdf("bin/2022-03-03-algorand-governance-period-2.hdf")
-gov_period1 = pd.read_hdf("bin/2022-01-15-algorand-governance-period-1.hdf")
-
-# extract eligible accounts:
-gov_period2_eligible = gov_period2[gov_period2.eligible==True].copy()
-gov_period1_eligible = gov_period1[gov_period1.eligible==True].copy()
-
-# set indices:
-gov_period2 = gov_period2.set_index("address",drop=False)
-gov_period1 = gov_period1.set_index("address",drop=False)
+# read eligible accounts from the governance store; the
+# eligibility filter and column selection are pushed down
+# to the store so only the rows and columns used are read:
+gov_period2_eligible = read_snapshot(
+    2,
+    "2022-03-03",
+    columns=["address_id","committed_algos"],
+    eligible=True,
+    )
+gov_period1_eligible = read_snapshot(
+    1,
+    "2022-01-15",
+    columns=["address_id","committed_algos"],
+    eligible=True,
+    )
 
 # -----------------------------------------------------
 # Plot setup.
@@ -79,18 +87,31 @@ plt.close()
 # -----------------------------------------------------
 # Top remaining whales.
 # -----------------------------------------------------
+# partial selection of the largest eligible commitments of
+# last week's and this week's snapshots:
 cutoff = 25
-gov_period2_eligible_whales = gov_period2_eligible.sort_values(
-    by="committed_algos",
-    ascending=False,
-    ).iloc[:cutoff,:].copy(
+whales = whaletracker(k=cutoff)
+gov_period2_last_week = read_snapshot(
+    2,
+    "2022-02-23",
+    columns=["address_id","committed_algos"],
+    eligible=True,
+    )
+whales.ingest(
+    "2022-02-23",
+    gov_period2_last_week.address_id,
+    gov_period2_last_week.committed_algos,
     )
-gov_period2_total = gov_period2_eligible.committed_algos.sum()
-gov_period2_eligible_whales["ratio"] = (
-    gov_period2_eligible_whales.committed_algos
-    / gov_period2_total
+gov_period2_eligible_whales = whales.ingest(
+    "2022-03-03",
+    gov_period2_eligible.address_id,
+    gov_period2_eligible.committed_algos,
     )
 
+# rank movement among the whales since last week:
+whales.movement("2022-02-23","2022-03-03").to_excel(
+    "bin/whale-rank-movement.xlsx")
+
 # plot:
 fig,ax = plt.subplots()
 plt.title("""Algorand Governance Period 2
@@ -115,26 +136,13 @@ plt.close()
 # -----------------------------------------------------
 # Top whale cutoff percentage control.
 # -----------------------------------------------------
-gov_period1_total = gov_period1_eligible.committed_algos.sum()
-gov_period2_total = gov_period2_eligible.committed_algos.sum()
+# one sort and cumulative sum per period gives the
+# top-k share for every cutoff:
 cutoff_list = [1,2,3,4]+[5*x for x in range(1,60)]
-ratio_list_p1 = []
-ratio_list_p2 = []
-for ci in cutoff_list:
-    dfi1 = gov_period1_eligible.sort_values(
-        by="committed_algos",
-        ascending=False,
-        ).iloc[:ci,:].copy(
-        )
-    dfi2 = gov_period2_eligible.sort_values(
-        by="committed_algos",
-        ascending=False,
-        ).iloc[:ci,:].copy(
-        )
-    ratio1 = dfi1.committed_algos.sum() / gov_period1_total
-    ratio2 = dfi2.committed_algos.sum() / gov_period2_total
-    ratio_list_p1.append(ratio1)
-    ratio_list_p2.append(ratio2)
+concentration_p1 = concentration(gov_period1_eligible.committed_algos)
+concentration_p2 = concentration(gov_period2_eligible.committed_algos)
+ratio_list_p1 = concentration_p1.top_share(cutoff_list)
+ratio_list_p2 = concentration_p2.top_share(cutoff_list)
 fig,ax = plt.subplots()
 plt.title("""Algorand Governance Period 2
 eligible whale commitments relative to total committed""")
@@ -171,3 +179,13 @@ df = pd.DataFrame(
 df.to_excel("bin/whale-control.xlsx")
 
 
+
+# concentration summary (top-k shares, Gini and Nakamoto
+# coefficients) of both periods:
+concentration_table(
+    {
+        "period 1 (final)": gov_period1_eligible.committed_algos,
+        "period 2 (2022-03-03)": gov_period2_eligible.committed_algos,
+        },
+    [1,5,25,50,75,100],
+    ).to_excel("bin/concentration.xlsx")
@@ -0,0 +1,73 @@
+"""Project the end-of-period governance reward rate.
+
+Drop-out hazards per commitment bucket are estimated from the churn
+between every stored snapshot of the period; each eligible governor
+of the latest snapshot then drops out before the period ends with
+probability 1 - exp(-hazard*days_remaining). The reward rate
+distribution comes from a Monte Carlo simulation of those outcomes.
+"""
+import time
+import numpy as np
+import pandas as pd
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+from govstore import read_snapshot, snapshot_dates, REWARD_POOLS, PERIOD_ENDS
+from govstats import (
+    snapshotpanel,
+    dropout_hazard,
+    commitment_bucket,
+    project_reward_rate,
+    )
+
+# projection parameters:
+governance_period = 2
+simulations = 200000
+
+# every stored snapshot of the period:
+columns = ["address_id","committed_algos","eligible"]
+dates = snapshot_dates(governance_period)
+panel = snapshotpanel({
+    date: read_snapshot(governance_period,date,columns=columns)
+    for date in dates
+    })
+hazard = dropout_hazard(panel)
+
+# drop-out probability of every currently eligible governor:
+latest = panel.labels.index(dates[-1])
+eligible = panel.eligible[latest]
+committed = panel.committed[latest,eligible]
+days_remaining = (pd.Timestamp(PERIOD_ENDS[governance_period])
+    - pd.Timestamp(dates[-1])).days
+bucket_hazard = hazard.hazard.fillna(0.0).to_numpy()
+dropout_probability = 1.0 - np.exp(
+    -bucket_hazard[commitment_bucket(committed)]*days_remaining)
+
+# simulate:
+t0 = time.perf_counter()
+reward_rate = project_reward_rate(
+    committed,
+    dropout_probability,
+    REWARD_POOLS[governance_period],
+    simulations=simulations,
+    )
+elapsed = time.perf_counter() - t0
+print("%d simulations of %d eligible governors in %.2f s"%(
+    simulations,len(committed),elapsed))
+
+# summary:
+current_rate = 1.0 + REWARD_POOLS[governance_period]/committed.sum()
+percentiles = [0.05,0.25,0.5,0.75,0.95]
+projection = pd.Series(
+    np.quantile(reward_rate,percentiles),
+    index=["%g%%"%(100*p) for p in percentiles],
+    )
+projection["mean"] = reward_rate.mean()
+projection["current"] = current_rate
+print(projection)
+with pd.ExcelWriter("bin/reward-rate-projection.xlsx") as writer:
+    hazard.to_excel(writer,sheet_name="dropout hazard")
+    projection.to_frame("reward_rate").to_excel(writer,sheet_name="projection")
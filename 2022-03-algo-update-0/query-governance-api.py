@@ -1,109 +1,113 @@
+"""Query the Algorand Foundation's governance API.
+
+Crawls any set of governance periods concurrently and writes each as
+today's partition of the governance store (see govstore.py):
+
+    python query-governance-api.py 1 2 3
+"""
+import argparse
+import os
 import numpy as np
-import pandas as pd
-import json
 from datetime import datetime
-from subprocess import Popen, PIPE
 
-# -----------------------------------------------------
-# Local functions.
-# -----------------------------------------------------
-# function to query the API via curl:
-def governance_api_query(
-    governance_period, #integer
-    offset, #integer
-    verbose=True,
-    ):
-    url = [
-        "https://governance.algorand.foundation/api",
-        "periods/governance-period-%d/governors"%governance_period,
-        "?ordering=-registration_datetime&limit=100&offset=%d"%offset,
-        ]
-    url = "/".join(url)
-    if verbose:
-        print(url)
-    cmd = [
-        "curl",
-        url,
-        "--header",
-        "Accept: application/json",
-        "--header",
-        "Content-Type: application/json",
-        ]
-    p = Popen(cmd,stdout=PIPE,stderr=PIPE)
-    stdout,stderr = p.communicate()
-    return json.loads(stdout)["results"]
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
 
-# function to extract governance data we care about from the
-# 'results' object returned by the API:
-def extract_governor_data(
-    results_item,
-    data_list,
-    ):
-    address = results_item["account"]["address"]
-    committed_algos = results_item["committed_algo_amount"]
-    eligible_flag = results_item["is_eligible"]
-    registration_datetime = results_item["registration_datetime"]
-    data_list.append([
-        address, #wallet public address
-        registration_datetime, #datetime Zulu (UTC)
-        committed_algos, #micro-algos
-        eligible_flag, #governance eligibility 
-        ])
+# personal modules:
+import govapi
+import govstore
+import httpcache
 
 # -----------------------------------------------------
-# Query API.
+# Options.
 # -----------------------------------------------------
-# define an upper bound for the number of API
-# calls so that we don't run forever:
-max_number_of_pages = 800
-
-# itervate over each governance period: 
-for governance_period in [2]:
-    current_page = 0
-    data_list = []
-    
-    # query each page until all results are returned,
-    # or we reach the max number of pages specified
-    # by the user:
-    while current_page < max_number_of_pages:
-        results = governance_api_query(
-            governance_period,
-            current_page*100,
-            )
-        
-        # list concatenation provides better efficiency:
-        [extract_governor_data(x,data_list) for x in results]
-        
-        # break if no more pages:
-        if len(results) < 100:
-            print("final page: %d"%current_page)
-            break
-        else:
-            current_page += 1
-
-    # convert to pandas dataframe:
-    df = pd.DataFrame(
-        data_list,
-        columns=[
-            "address",
-            "registration",
-            "committed_algos",
-            "eligible",
-            ],
-        )
-
-    # format data where applicable and save.
-    # the api returns algos as 'microalgos'; divide 
-    # by 1e6 to get the number of actual algos:
-    df.loc[:,"committed_algos"] = df.committed_algos.apply(float)/1e6
-    df.loc[:,"registration"] = pd.to_datetime(df.registration)
-    output_fi = "bin/%s-algorand-governance-period-%d.hdf"%(
-        datetime.today().strftime("%Y-%m-%d"),
-        governance_period,
-        )
-    df.to_hdf(output_fi,"w",mode="w")
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument(
+    "periods",
+    nargs="*",
+    type=int,
+    default=[2],
+    help="governance periods to crawl (default: 2)",
+    )
+parser.add_argument(
+    "--delta",
+    action="store_true",
+    help="read only pages of new registrations; known governors "
+        "keep the last snapshot's eligibility and commitment",
+    )
+parser.add_argument(
+    "--recheck-largest",
+    type=int,
+    default=0,
+    help="with --delta, re-query the eligibility and commitment of "
+        "the N largest known governors, one request each",
+    )
+parser.add_argument(
+    "--requests-per-second",
+    type=float,
+    default=10.0,
+    help="request budget shared by all periods",
+    )
+args = parser.parse_args()
 
+# replay mode serves cached pages of any age, which would
+# be saved as today's partition:
+if httpcache.default_cache().mode == "replay":
+    parser.error("replay mode would save cached pages as today's snapshot")
 
+# define an upper bound for the number of API
+# calls so that we don't run forever, and the number
+# of requests in flight across all periods:
+max_number_of_pages = 800
+max_in_flight = 8
 
+# a full download of every page is the default, and the
+# only way to a current snapshot. with --delta, and a
+# snapshot of the period already in the governance store,
+# only pages newer than its latest registration are read;
+# every other governor keeps the last snapshot's
+# eligibility and commitment, except the --recheck-largest
+# ones, re-queried one address at a time (a period the
+# per-governor route cannot answer is crawled in full
+# instead):
+snapshots = {}
+recheck = {}
+for governance_period in args.periods:
+    last_snapshot = govstore.latest_snapshot_date(governance_period)
+    if not args.delta or last_snapshot is None:
+        continue
+    print("period %d: delta sync against %s"%(governance_period,last_snapshot))
+    df = govstore.read_snapshot(governance_period,last_snapshot)
+    snapshots[governance_period] = df
+    recheck[governance_period] = df.nlargest(
+        args.recheck_largest,"committed_algos").address.tolist()
 
+# -----------------------------------------------------
+# Query API.
+# -----------------------------------------------------
+# save each period as today's partition of the
+# governance store as soon as it finishes. full crawls
+# checkpoint every page under _checkpoints/, so
+# re-running after a failure resumes at the last good
+# page instead of starting over:
+today = datetime.today()
+checkpoint_dir = os.path.join(
+    govstore.STORE,
+    "_checkpoints",
+    today.strftime("%Y-%m-%d"),
+    )
+def save_period(governance_period, df):
+    output_fi = govstore.write_snapshot(df,governance_period,today)
+    print("saved %s"%output_fi)
 
+govapi.crawl_periods(
+    args.periods,
+    snapshots=snapshots,
+    recheck=recheck,
+    requests_per_second=args.requests_per_second,
+    max_in_flight=max_in_flight,
+    on_period=save_period,
+    checkpoint_dir=checkpoint_dir,
+    max_number_of_pages=max_number_of_pages,
+    )
@@ -0,0 +1,40 @@
+"""Write committed Algo percentiles of every stored snapshot.
+
+Percentiles come from the governance store's quantile sketches
+(see govstore.py), so no snapshot is read; values are within
+govstore.SKETCH_ACCURACY of the exact percentiles.
+"""
+import pandas as pd
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+from govstore import read_metrics, read_sketch
+
+# percentiles to report:
+percentiles = [0.01,0.1,0.25,0.5,0.75,0.9,0.99,0.999]
+labels = ["%g%%"%(100*p) for p in percentiles]
+
+def percentile_table(eligible):
+    rows = {}
+    # one row per stored snapshot:
+    for period,date in read_metrics().index:
+        sketch = read_sketch(periods=period,dates=date,eligible=eligible)
+        rows[("period %d"%period,date)] = sketch.quantile(percentiles)
+    # every snapshot of a period, and of all periods, merged:
+    for period in sorted(set(read_metrics().index.get_level_values("period"))):
+        sketch = read_sketch(periods=period,eligible=eligible)
+        rows[("period %d"%period,"all dates")] = sketch.quantile(percentiles)
+    sketch = read_sketch(eligible=eligible)
+    rows[("all periods","all dates")] = sketch.quantile(percentiles)
+    return pd.DataFrame(
+        list(rows.values()),
+        index=pd.MultiIndex.from_tuples(rows,names=["period","date"]),
+        columns=labels,
+        )
+
+with pd.ExcelWriter("bin/commitment-percentiles.xlsx") as writer:
+    percentile_table(False).to_excel(writer,sheet_name="all governors")
+    percentile_table(True).to_excel(writer,sheet_name="eligible governors")
@@ -2,26 +2,40 @@
 import numpy as np
 import pandas as pd
 
-# read data:
-gov_last = pd.read_hdf("bin/2022-02-23-algorand-governance-period-2.hdf")
-gov_current = pd.read_hdf("bin/2022-03-03-algorand-governance-period-2.hdf")
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
 
-# extract eligible accounts:
-gov_last = gov_last[gov_last.eligible==True].copy()
-gov_current = gov_current[gov_current.eligible==True].copy()
+# personal modules:
+from govstore import read_snapshot, read_metrics
+from govstats import snapshotpanel
 
-# set indices:
-gov_last = gov_last.set_index("address",drop=False)
-gov_current = gov_current.set_index("address",drop=False)
+# read both snapshots; only the columns used are read
+# from the governance store:
+columns = ["address_id","committed_algos","eligible"]
+snapshots = {
+    "2022-02-23": read_snapshot(2,"2022-02-23",columns=columns),
+    "2022-03-03": read_snapshot(2,"2022-03-03",columns=columns),
+    }
+
+# per-address outcomes (joined, left, became ineligible,
+# commitment changes) and the aggregate flows between them:
+panel = snapshotpanel(snapshots)
+flows = panel.flows("2022-02-23","2022-03-03")
+flows.to_excel("bin/last-week-flows.xlsx")
+
+# headline numbers come from the governance metrics table:
+metrics = read_metrics()
+gov_last = metrics.loc[(2,"2022-02-23")]
+gov_current = metrics.loc[(2,"2022-03-03")]
 
 # exract committed algos count:
-current_algos = gov_current.committed_algos.sum()/1e6
-last_algos = gov_last.committed_algos.sum()/1e6
+current_algos = gov_current.committed_algos/1e6
+last_algos = gov_last.committed_algos/1e6
 
-# calculate reward rate:
-p2_reward = 70.5 #millions
-current_reward_rate = 1.0 + p2_reward/current_algos
-last_reward_rate = 1.0 + p2_reward/last_algos
+# reward rate:
+current_reward_rate = gov_current.reward_rate
+last_reward_rate = gov_last.reward_rate
 
 # define latex table:
 table_header = """%
@@ -37,13 +51,13 @@ Committed algos [millions] & {c10} & {c11} & {c12} \\\\
 Period reward rate & {c20} & {c21} & {c22} \\\\
 \hline
 """.format(
-    c00=gov_last.shape[0],
+    c00=int(gov_last.eligible_governors),
     c10=round(last_algos,2),
     c20=round(last_reward_rate,3),
-    c01=gov_current.shape[0],
+    c01=int(gov_current.eligible_governors),
     c11=round(current_algos,2),
     c21=round(current_reward_rate,3),
-    c02=gov_current.shape[0]-gov_last.shape[0],
+    c02=int(gov_current.eligible_governors-gov_last.eligible_governors),
     c12=round(current_algos-last_algos,2),
     c22=round(current_reward_rate-last_reward_rate,4),
     )
@@ -0,0 +1,32 @@
+"""Write the time-to-ineligibility survival table of a period.
+
+Governors enter when first seen eligible and leave when first seen
+ineligible (or gone) across every stored snapshot of the period; the
+Kaplan-Meier survival per commitment bucket is in govstats.py.
+"""
+import pandas as pd
+
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
+
+# personal modules:
+from govstore import read_snapshot, snapshot_dates
+from govstats import snapshotpanel, eligibility_survival
+
+# analysis parameters:
+governance_period = 2
+
+# every stored snapshot of the period:
+columns = ["address_id","committed_algos","eligible"]
+panel = snapshotpanel({
+    date: read_snapshot(governance_period,date,columns=columns)
+    for date in snapshot_dates(governance_period)
+    })
+survival = eligibility_survival(panel)
+
+# survival per bucket (columns) and days since entry (rows):
+curves = survival.survival.unstack(level="bucket").ffill().fillna(1.0)
+with pd.ExcelWriter("bin/eligibility-survival.xlsx") as writer:
+    survival.to_excel(writer,sheet_name="life table")
+    curves.to_excel(writer,sheet_name="survival")
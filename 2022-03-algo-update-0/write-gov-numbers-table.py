@@ -1,27 +1,26 @@
 import numpy as np
 import pandas as pd
 
-# read data:
-gov_period2 = pd.read_hdf("bin/2022-03-03-algorand-governance-period-2.hdf")
-gov_period1 = pd.read_hdf("bin/2022-01-15-algorand-governance-period-1.hdf")
+# set local paths to enable imports:
+from _path import setup_paths
+setup_paths()
 
-# extract eligible accounts:
-gov_period2 = gov_period2[gov_period2.eligible==True].copy()
-gov_period1 = gov_period1[gov_period1.eligible==True].copy()
+# personal modules:
+from govstore import read_metrics
 
-# set indices:
-gov_period2 = gov_period2.set_index("address",drop=False)
-gov_period1 = gov_period1.set_index("address",drop=False)
+# read both snapshots' rows of the governance metrics
+# table (eligible governors, committed algos, reward rate):
+metrics = read_metrics()
+p1 = metrics.loc[(1,"2022-01-15")]
+p2 = metrics.loc[(2,"2022-03-03")]
 
 # exract committed algos count:
-p1_algos = gov_period1.committed_algos.sum()/1e6
-p2_algos = gov_period2.committed_algos.sum()/1e6
+p1_algos = p1.committed_algos/1e6
+p2_algos = p2.committed_algos/1e6
 
-# calculate reward rate:
-p1_reward = 60.0 #millions
-p2_reward = 70.5 #millions
-p1_reward_rate = 1.0 + p1_reward/p1_algos
-p2_reward_rate = 1.0 + p2_reward/p2_algos
+# reward rate:
+p1_reward_rate = p1.reward_rate
+p2_reward_rate = p2.reward_rate
 
 # define latex table:
 table_header = """%
@@ -38,11 +37,11 @@ Rewards pool [millions] & 60 & 70.5 & 1.175 \\\\
 Period reward rate & {c30} & {c31} & {c32} \\\\
 \hline
 """.format(
-    c00=gov_period1.shape[0],
+    c00=int(p1.eligible_governors),
     c10=round(p1_algos,2),
-    c01=gov_period2.shape[0],
+    c01=int(p2.eligible_governors),
     c11=round(p2_algos,2),
-    c02=round(gov_period2.shape[0]/gov_period1.shape[0], 2),
+    c02=round(p2.eligible_governors/p1.eligible_governors, 2),
     c12=round(p2_algos/p1_algos,2),
     c30=round(p1_reward_rate,4),
     c31=round(p2_reward_rate,4),
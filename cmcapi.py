@@ -0,0 +1,308 @@
+"""coinmarketcap historical listings client.
+
+Weekly listings are requested concurrently over a pool of keep-alive
+connections. A token bucket (webclient.ratelimiter) holds the request
+rate to what the web API allows, instead of a fixed pause after
+every request.
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+# personal modules:
+from webclient import connectionpool, iter_pages, ratelimiter
+
+# default API root:
+CMC_API = "https://web-api.coinmarketcap.com/v1"
+
+# allowed request rate; the original scrapes paused 3 s
+# between sequential requests:
+REQUESTS_PER_SECOND = 1.0
+
+def historical_url(
+    date, #datetime or YYYY-MM-DD string
+    limit, #integer
+    start=1, #rank of the first coin, from 1
+    convert="USD",
+    api=CMC_API,
+    ):
+    url = [
+        api,
+        "cryptocurrency/listings/historical",
+        ]
+    options = "convert=%s&date=%s&limit=%d&start=%d"%(
+        convert,
+        pd.Timestamp(date).strftime("%Y-%m-%d"),
+        limit,
+        start,
+        )
+    return "%s?%s"%("/".join(url),options)
+
+def iter_historical(
+    dates,
+    limit=2000,
+    requests_per_second=REQUESTS_PER_SECOND,
+    max_in_flight=4,
+    convert="USD",
+    api=CMC_API,
+    pool=None,
+    verbose=True,
+    ):
+    """Yield (date, response body) for every date as responses arrive.
+
+    Up to max_in_flight requests are open at once; the pool's rate
+    limiter spaces them out. Without a pool, one is created with a
+    token bucket at requests_per_second.
+    """
+    own_pool = pool is None
+    if own_pool:
+        pool = connectionpool(
+            api,
+            maxsize=max_in_flight,
+            limiter=ratelimiter(requests_per_second,max_concurrent=max_in_flight),
+            )
+
+    def fetch(date):
+        url = historical_url(date,limit,convert=convert,api=api)
+        body = pool.get(url)
+        if verbose:
+            print("scraped %s"%pd.Timestamp(date).strftime("%Y-%m-%d"))
+        return body
+
+    try:
+        with ThreadPoolExecutor(max_in_flight) as executor:
+            futures = {executor.submit(fetch,x): x for x in dates}
+            try:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+    finally:
+        if own_pool:
+            pool.close()
+
+def scrape_historical(
+    dates,
+    requests_per_second=REQUESTS_PER_SECOND,
+    max_in_flight=4,
+    api=CMC_API,
+    **kwargs
+    ):
+    """Return ({date: response body}, achieved requests per second).
+
+    Other keyword arguments are passed to iter_historical(). Cached
+    responses are not requests and do not count.
+    """
+    dates = list(dates)
+    pool = connectionpool(
+        api,
+        maxsize=max_in_flight,
+        limiter=ratelimiter(requests_per_second,max_concurrent=max_in_flight),
+        )
+    t0 = time.perf_counter()
+    try:
+        bodies = dict(iter_historical(
+            dates,
+            max_in_flight=max_in_flight,
+            api=api,
+            pool=pool,
+            **kwargs
+            ))
+    finally:
+        pool.close()
+    elapsed = time.perf_counter() - t0
+    bodies = {x: bodies[x] for x in dates}
+    requests = pool.request_count
+    return bodies, requests/elapsed if elapsed > 0 else float("inf")
+
+# -----------------------------------------------------
+# Listings data frames.
+# -----------------------------------------------------
+def listings_frame(
+    body, #listings response body (bytes or str)
+    convert="USD",
+    ):
+    """Decode a listings response into typed columns.
+
+    The frame has the original process_json() layout: one row per
+    coin indexed by name, the quote fields (float64, except
+    last_updated), symbol and int64 cmc_rank, plus the int64
+    coinmarketcap 'id' that identifies a coin (names are not
+    unique). Each field is pulled
+    out of the entries in one pass instead of building a Series per
+    coin.
+    """
+    data = json.loads(body)["data"]
+    quotes = [x["quote"][convert] for x in data]
+    fields = list(quotes[0]) if quotes else []
+    columns = {}
+    for field in fields:
+        values = [x.get(field) for x in quotes]
+        if field == "last_updated":
+            columns[field] = np.array(values,dtype=object)
+        else:
+            columns[field] = np.array(values,dtype=float)
+    columns["symbol"] = np.array([x["symbol"] for x in data],dtype=object)
+    columns["cmc_rank"] = np.array([x["cmc_rank"] for x in data],dtype=np.int64)
+    columns["id"] = np.array([x["id"] for x in data],dtype=np.int64)
+    return pd.DataFrame(
+        columns,
+        index=pd.Index([x["name"] for x in data],name="name"),
+        )
+
+# -----------------------------------------------------
+# Paged listings.
+# -----------------------------------------------------
+# coins per 'start' window of a paged fetch; the same limit
+# as the original single request (benchmark-cmc-pages.py:
+# pages of 2000 are faster than pages of 1000, in half the
+# requests):
+PAGE_LIMIT = 2000
+
+class rankcontinuityerror(ValueError):
+    """Listing pages that do not stitch into consecutive ranks."""
+
+def check_rank_continuity(
+    ranks, #cmc_rank of a page, in response order
+    start, #rank the page was requested from
+    date=None,
+    ):
+    """Raise rankcontinuityerror unless ranks run start, start+1, ..."""
+    ranks = np.asarray(ranks)
+    expected = np.arange(start,start+len(ranks))
+    bad = np.flatnonzero(ranks != expected)
+    if len(bad):
+        raise rankcontinuityerror("%s: rank %d where %d was expected"%(
+            "" if date is None else pd.Timestamp(date).strftime("%Y-%m-%d"),
+            ranks[bad[0]],
+            expected[bad[0]],
+            ))
+
+def iter_listing_pages(
+    date, #datetime or YYYY-MM-DD string
+    page_limit=PAGE_LIMIT,
+    max_pages=100,
+    max_in_flight=4,
+    convert="USD",
+    api=CMC_API,
+    pool=None,
+    verbose=True,
+    ):
+    """Yield (start, listings frame) per 'start' window, in rank order.
+
+    Up to max_in_flight windows ahead of the consumer are requested
+    concurrently. Iteration stops after the first short page; every
+    page is checked to continue the ranks of the one before it.
+    """
+    own_pool = pool is None
+    if own_pool:
+        pool = connectionpool(api,maxsize=max_in_flight)
+
+    def fetch(page):
+        start = 1 + page*page_limit
+        url = historical_url(date,page_limit,start=start,convert=convert,api=api)
+        if verbose:
+            print(url)
+        return listings_frame(pool.get(url),convert=convert)
+
+    pages = iter_pages(
+        fetch,
+        lambda frame: len(frame) < page_limit,
+        max_pages=max_pages,
+        max_in_flight=max_in_flight,
+        )
+    try:
+        for page,frame in pages:
+            start = 1 + page*page_limit
+            check_rank_continuity(frame.cmc_rank.to_numpy(),start,date)
+            yield start, frame
+    finally:
+        pages.close()
+        if own_pool:
+            pool.close()
+
+def fetch_listings(
+    date, #datetime or YYYY-MM-DD string
+    max_coins=None, #None for the whole universe
+    page_limit=PAGE_LIMIT,
+    **kwargs
+    ):
+    """Return the listings frame of a date stitched from 'start' pages.
+
+    Keyword arguments are passed to iter_listing_pages().
+    """
+    max_pages = 100
+    if max_coins is not None:
+        page_limit = min(page_limit,max_coins)
+        max_pages = -(-max_coins//page_limit)
+    frames = [
+        frame
+        for _,frame in iter_listing_pages(
+            date,
+            page_limit=page_limit,
+            max_pages=max_pages,
+            **kwargs
+            )
+        ]
+    df = pd.concat(frames)
+    return df if max_coins is None else df.iloc[:max_coins]
+
+def scrape_listings(
+    dates,
+    max_coins=None, #None for the whole universe
+    page_limit=PAGE_LIMIT,
+    requests_per_second=REQUESTS_PER_SECOND,
+    max_in_flight=4, #dates
+    pages_in_flight=4, #pages per date
+    api=CMC_API,
+    verbose=True,
+    ):
+    """Return ({date: listings frame}, achieved requests per second,
+    {date: error}).
+
+    Dates and their pages are fetched concurrently over one pool;
+    its token bucket holds every request to requests_per_second.
+    Cached responses are not requests and do not count. A date that
+    fails (e.g. rankcontinuityerror, or an HTTP error left after the
+    retries) is reported in the errors dict instead of raising, so
+    the dates already fetched are kept.
+    """
+    dates = list(dates)
+    connections = max_in_flight*pages_in_flight
+    pool = connectionpool(
+        api,
+        maxsize=connections,
+        limiter=ratelimiter(requests_per_second,max_concurrent=connections),
+        )
+
+    def fetch(date):
+        try:
+            return fetch_listings(
+                date,
+                max_coins=max_coins,
+                page_limit=page_limit,
+                max_in_flight=pages_in_flight,
+                api=api,
+                pool=pool,
+                verbose=verbose,
+                ), None
+        except Exception as error:
+            if verbose:
+                print("%s failed: %s"%(pd.Timestamp(date).strftime("%Y-%m-%d"),error))
+            return None, error
+
+    t0 = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_in_flight) as executor:
+            results = dict(zip(dates,executor.map(fetch,dates)))
+    finally:
+        pool.close()
+    elapsed = time.perf_counter() - t0
+    requests = pool.request_count
+    frames = {x: df for x,(df,error) in results.items() if error is None}
+    errors = {x: error for x,(_,error) in results.items() if error is not None}
+    return frames, requests/elapsed if elapsed > 0 else float("inf"), errors
@@ -0,0 +1,246 @@
+"""Features of the weekly coinmarketcap scrape panel.
+
+The panel (cmcstore.read_panel) holds one row per week and coin.
+Analyses work on week x coin matrices instead: one column per coin,
+one row per scraped week, NaN where a coin was not listed.
+
+Rank deltas derived from those matrices are cached in a feature store,
+
+    bin/cmc-features/<content hash of the rankings>/
+
+so each scrape version computes them once, and every analysis script
+loads the same precomputed matrices.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# default feature store location, shared by every post directory:
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+FEATURE_DIR = os.path.join(REPO_DIR,"bin","cmc-features")
+
+# fields written by data-setup.py, and their file name tags:
+HISTORY_FIELDS = {
+    "cmc_rank": "rank",
+    "price": "price",
+    "market_cap": "market-cap",
+    }
+
+def coin_labels(
+    listings, #read_panel() frame: name, symbol and cmc_rank columns
+    coin_codes, #position of each row's coin in the coin order
+    number_of_coins,
+    ):
+    """Return each coin's latest name and a unique column label.
+
+    Names are not unique. Of the coins sharing a name, the one with
+    the best rank keeps the plain name and the others get their
+    symbol and coin_id appended, e.g. 'Unicorn (UNI2, 1234)'.
+    """
+    rows = pd.Series(np.arange(len(listings))).groupby(coin_codes).last()
+    latest = listings.iloc[rows.to_numpy()]
+    names = latest["name"].to_numpy().astype(str)
+    best = pd.Series(listings.cmc_rank.to_numpy()).groupby(coin_codes).min()
+    order = np.argsort(best.to_numpy(),kind="stable")
+    shared = np.zeros(number_of_coins,dtype=bool)
+    shared[order] = pd.Index(names[order]).duplicated(keep="first")
+    labels = names.astype(object)
+    for i in np.flatnonzero(shared):
+        labels[i] = "%s (%s, %d)"%(
+            names[i],
+            latest["symbol"].iloc[i],
+            latest.index.get_level_values(1)[i],
+            )
+    return pd.Index(names), pd.Index(labels.astype(str))
+
+def history_matrices(
+    listings, #read_panel() frame, or a frame indexed by (week, name)
+    fields=tuple(HISTORY_FIELDS),
+    exclude=(), #coin names to leave out, all coins of a name alike
+    ):
+    """Return {field: week x coin frame} from a single pivot.
+
+    Weeks and coins are factorized once, and every field is
+    scattered into a preallocated (fields, weeks, coins) array in one
+    assignment. Coins keep their order of first appearance in the
+    panel. A read_panel() frame keys coins by coin_id and labels them
+    with coin_labels(); a frame indexed by (week, name) keys them by
+    name, so coins sharing a name share a column.
+    """
+    fields = list(fields)
+    week_codes, weeks = pd.factorize(
+        listings.index.get_level_values(0),sort=True)
+    coin_codes, coins = pd.factorize(listings.index.get_level_values(1))
+    if "name" in listings.columns:
+        names, coins = coin_labels(listings,coin_codes,len(coins))
+    else:
+        coins = names = pd.Index(np.asarray(coins).astype(str))
+
+    values = listings[fields].to_numpy(dtype=float)
+    matrices = np.full((len(fields),len(weeks),len(coins)),np.nan)
+    matrices[:,week_codes,coin_codes] = values.T
+
+    keep = ~names.isin(list(exclude))
+    weeks = pd.Index(weeks,name=listings.index.names[0])
+    return {
+        field: pd.DataFrame(
+            matrices[i][:,keep],
+            index=weeks,
+            columns=coins[keep],
+            )
+        for i,field in enumerate(fields)
+        }
+
+def history_path(
+    field, #key of HISTORY_FIELDS
+    thru_date, #YYYY-MM-DD string
+    save_dir="bin",
+    ):
+    return "%s/cmc-%s-histories-thru-%s.hdf"%(
+        save_dir,
+        HISTORY_FIELDS[field],
+        thru_date,
+        )
+
+# -----------------------------------------------------
+# Rank deltas.
+# -----------------------------------------------------
+# matrices held by the feature store; '_p' deltas are
+# relative to the previous rank:
+RANK_DELTAS = [
+    "dmcr_per_week",
+    "dmcr_per_week_p",
+    "dmcr_per_month",
+    "dmcr_per_month_p",
+    ]
+
+def content_hash(df):
+    """Hex digest of a frame's values, index and columns."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df,index=True).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(df.columns.to_series(),index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+def first_sundays(rankings):
+    """Ranks on the first scraped week of every month."""
+    return rankings[~rankings.index.to_period("M").duplicated()]
+
+def _deltas(df):
+    values = df.to_numpy(dtype=float)
+    delta = np.full_like(values,np.nan)
+    delta[1:] = values[1:] - values[:-1]
+    percent = np.full_like(values,np.nan)
+    percent[1:] = delta[1:] / values[:-1]
+    return [
+        pd.DataFrame(x,index=df.index,columns=df.columns)
+        for x in [delta,percent]
+        ]
+
+def rank_deltas(
+    rankings, #week x coin rank matrix
+    ):
+    """Return {name: matrix} of RANK_DELTAS: absolute and relative
+    rank changes week over week, and between first Sundays."""
+    per_week = _deltas(rankings)
+    per_month = _deltas(first_sundays(rankings))
+    return dict(zip(RANK_DELTAS,per_week+per_month))
+
+def load_rank_deltas(
+    rankings, #week x coin rank matrix
+    feature_dir=FEATURE_DIR,
+    verbose=True,
+    ):
+    """rank_deltas() of the rankings, computed once per rankings
+    content and read back from the feature store afterwards."""
+    path = os.path.join(feature_dir,content_hash(rankings))
+    if os.path.isdir(path):
+        return {
+            name: pd.read_parquet(os.path.join(path,"%s.parquet"%name))
+            for name in RANK_DELTAS
+            }
+    if verbose:
+        print("computing rank deltas into %s"%path)
+    deltas = rank_deltas(rankings)
+    os.makedirs(feature_dir,exist_ok=True)
+    temp_dir = tempfile.mkdtemp(dir=feature_dir)
+    for name,df in deltas.items():
+        df.to_parquet(os.path.join(temp_dir,"%s.parquet"%name))
+    try:
+        os.rename(temp_dir,path)
+    except OSError:
+        # another process stored the same rankings first:
+        shutil.rmtree(temp_dir)
+    return deltas
+
+# -----------------------------------------------------
+# Screening.
+# -----------------------------------------------------
+# coins left out of the rank analyses, by category:
+COIN_CATEGORIES = {
+    "stablecoins": [
+        "Tether",
+        "Binance USD",
+        "USD Coin",
+        "TerraUSD",
+        "Neutrino USD",
+        "Dai",
+        "TrueUSD",
+        "Gemini Dollar",
+        ],
+    "derivatives": [
+        "Bitcoin BEP2",
+        "Wrapped Bitcoin",
+        "Ethereum Classic",
+        "Wrapped BNB",
+        "Huobi BTC",
+        "RenBTC",
+        "Bitcoin Cash ABC",
+        ],
+    "memecoins": [
+        "SHIBA INU",
+        "Dogecoin",
+        "Dogelon Mars",
+        ],
+    }
+
+def screen_coins(
+    rankings, #week x coin rank matrix
+    rank_deltas=None, #week x coin rank changes, for min_negative_moves
+    min_negative_moves=None, #periods with a summed rank change < 0
+    move_period="4W",
+    min_rank=None, #best rank over the weeks must be >= min_rank
+    exclude_top=None, #drop the top-N coins of the last week
+    exclude_categories=(), #keys of COIN_CATEGORIES
+    exclude=(), #coin names
+    ):
+    """Return the coins passing every predicate, in column order.
+
+    Each predicate is one operation over the whole matrix (or one
+    set lookup over the columns) giving a boolean per coin; the
+    screen is their conjunction. A coin without any rank in the
+    weeks fails min_rank.
+    """
+    coins = rankings.columns
+    keep = np.ones(len(coins),dtype=bool)
+
+    excluded = set(exclude)
+    for category in exclude_categories:
+        excluded.update(COIN_CATEGORIES[category])
+    if exclude_top is not None:
+        current = rankings.iloc[-1]
+        excluded.update(current.index[current <= exclude_top])
+    if excluded:
+        keep &= ~coins.isin(excluded)
+
+    if min_rank is not None:
+        keep &= (rankings.min() >= min_rank).to_numpy()
+
+    if min_negative_moves is not None:
+        moves = rank_deltas[coins].resample(move_period).sum()
+        keep &= (moves.to_numpy() < 0).sum(axis=0) >= min_negative_moves
+
+    return coins[keep]
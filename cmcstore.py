@@ -0,0 +1,290 @@
+"""Store of scraped coinmarketcap listings.
+
+Every scraped week is kept in one compact parquet file,
+
+    bin/cmc/listings.parquet
+
+so a scrape only requests the weeks the store does not hold yet and
+adds them, instead of re-downloading every week since 2020 into a
+new cmc-scrape-results-thru-<date>.hdf file. Adding weeks reads and
+rewrites the whole file (about 0.3 s for a hundred weeks of 2000
+coins), so weeks are written in batches: one write_weeks() call per
+scrape or imported file, not one per week.
+
+Rows are sorted by week and rank and stored compactly typed: an int32
+coin id from the coin book (bin/cmc/coins.parquet, one permanent id
+per coinmarketcap coin id; names are not unique), int32 cmc_rank,
+dictionary-encoded name and symbol, float32 percent changes and
+float64 price, volume and market cap. One file loads in a single
+read; read_panel() returns the stored layout indexed by (week,
+coin_id), with categorical names.
+
+Older cmc-scrape-results*.hdf files are copied into the store with
+import_hdf_scrape(), so their weeks are not scraped again.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+# personal modules:
+from filelock import filelock
+from idbook import idbook
+
+# default store location, shared by every post directory:
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE = os.path.join(REPO_DIR,"bin","cmc")
+
+# stored quote columns; any other quote field is float64:
+QUOTE_DTYPES = {
+    "price": np.float64,
+    "volume_24h": np.float64,
+    "percent_change_1h": np.float32,
+    "percent_change_24h": np.float32,
+    "percent_change_7d": np.float32,
+    "market_cap": np.float64,
+    }
+
+# -----------------------------------------------------
+# Coin book.
+# -----------------------------------------------------
+class coinbook(idbook):
+    """Append-only coin key <-> int32 id dictionary; see coin_keys()."""
+    def __init__(self, store=STORE):
+        idbook.__init__(self,os.path.join(store,"coins.parquet"),"key")
+
+def coin_keys(
+    df, #cmcapi.listings_frame() output
+    ):
+    """Return the coin book keys of listings rows: 'cmc:<id>', or
+    'name:<name>|<symbol>' for rows whose id is unknown (NaN)."""
+    ids = df["id"].to_numpy(dtype=float)
+    known = ~np.isnan(ids)
+    keys = np.char.add(
+        np.char.add("name:",df.index.to_numpy().astype(str)),
+        np.char.add("|",df.symbol.to_numpy().astype(str)),
+        ).astype(object)
+    keys[known] = np.char.add("cmc:",ids[known].astype(np.int64).astype(str))
+    return keys.astype(str)
+
+# serializes coin book and listings updates between
+# concurrent writers, threads and processes alike:
+def _store_lock(store):
+    return filelock(os.path.join(store,"_store.lock"))
+
+# -----------------------------------------------------
+# Listings.
+# -----------------------------------------------------
+def _day(date):
+    return pd.Timestamp(date).strftime("%Y-%m-%d")
+
+def _listings_path(store):
+    return os.path.join(store,"listings.parquet")
+
+def stored_weeks(store=STORE):
+    """Return the sorted YYYY-MM-DD weeks held by the store."""
+    path = _listings_path(store)
+    if not os.path.exists(path):
+        return []
+    weeks = pq.read_table(path,columns=["week"]).column("week").unique()
+    return sorted(pd.DatetimeIndex(weeks.to_numpy()).strftime("%Y-%m-%d"))
+
+def missing_weeks(
+    weeks, #datetimes or YYYY-MM-DD strings
+    store=STORE,
+    ):
+    """Return the weeks not yet in the store, in the given order."""
+    stored = set(stored_weeks(store))
+    return [x for x in weeks if _day(x) not in stored]
+
+def compact_frame(
+    df, #cmcapi.listings_frame() output, indexed by name
+    week, #datetime or YYYY-MM-DD string
+    book, #coinbook
+    ):
+    """Return one week's listings in the stored layout."""
+    columns = {
+        "week": np.full(len(df),pd.Timestamp(_day(week)),dtype="datetime64[s]"),
+        "coin_id": book.encode(coin_keys(df)),
+        "name": pd.Categorical(df.index.astype(str)),
+        }
+    for field in df.columns:
+        if field == "id":
+            continue
+        elif field == "symbol":
+            columns[field] = pd.Categorical(df.symbol.astype(str))
+        elif field == "cmc_rank":
+            columns[field] = df.cmc_rank.to_numpy(dtype=np.int32)
+        elif field == "last_updated":
+            columns[field] = pd.to_datetime(df.last_updated,utc=True).to_numpy()
+        else:
+            columns[field] = df[field].to_numpy(
+                dtype=QUOTE_DTYPES.get(field,np.float64))
+    return pd.DataFrame(columns)
+
+def write_weeks(
+    listings, #dict week -> cmcapi.listings_frame() output
+    store=STORE,
+    row_group_size=65536,
+    ):
+    """Add (or replace) weeks of listings; return the store file.
+
+    Every call rewrites the whole store file; pass all the weeks of
+    a scrape in one call.
+    """
+    path = _listings_path(store)
+    os.makedirs(store,exist_ok=True)
+    with _store_lock(store):
+        book = coinbook(store)
+        frames = [compact_frame(df,week,book) for week,df in listings.items()]
+        book.save()
+        if os.path.exists(path):
+            stored = pd.read_parquet(path)
+            replaced = stored.week.isin(pd.concat(frames).week.unique())
+            frames.insert(0,stored[~replaced])
+        df = pd.concat(frames,ignore_index=True)
+        df["name"] = df.name.astype("category")
+        df["symbol"] = df.symbol.astype("category")
+        df = df.sort_values(["week","cmc_rank"],kind="stable")
+        temp_path = "%s.tmp"%path
+        df.to_parquet(temp_path,index=False,row_group_size=row_group_size)
+        os.replace(temp_path,path)
+    return path
+
+def write_week(
+    df, #cmcapi.listings_frame() output, indexed by name
+    week, #datetime or YYYY-MM-DD string
+    store=STORE,
+    ):
+    """Add (or replace) one week of listings; see write_weeks()."""
+    return write_weeks({week: df},store=store)
+
+# -----------------------------------------------------
+# Import of cmc-scrape-results HDF files.
+# -----------------------------------------------------
+def _latest_coin_ids(
+    df, #rows with week, name, symbol, cmc_rank and id columns
+    ):
+    df = df.sort_values(["week","cmc_rank"],ascending=[False,True])
+    df = df.drop_duplicates(["name","symbol"])
+    return pd.Series(
+        df.id.to_numpy(dtype=np.int64),
+        index=pd.MultiIndex.from_arrays(
+            [df.name.astype(str),df.symbol.astype(str)],names=["name","symbol"]),
+        )
+
+def listings_coin_ids(
+    listings, #dict week -> cmcapi.listings_frame() output
+    ):
+    """Return the coinmarketcap id of every (name, symbol) of the
+    listings, from its latest week and best rank."""
+    df = pd.concat(listings,names=["week","name"]).reset_index()
+    return _latest_coin_ids(df)
+
+def stored_coin_ids(store=STORE):
+    """Return the coinmarketcap id of every stored (name, symbol),
+    from its latest week and best rank."""
+    columns = ["week","name","symbol","cmc_rank","id"]
+    if not os.path.exists(_listings_path(store)):
+        return _latest_coin_ids(pd.DataFrame(columns=columns))
+    df = read_panel(columns=["symbol","cmc_rank"],store=store).reset_index()
+    df["key"] = coinbook(store).decode(df.coin_id.to_numpy())
+    df = df[df.key.str.startswith("cmc:")]
+    df["id"] = df.key.str[len("cmc:"):].astype(np.int64)
+    return _latest_coin_ids(df[columns])
+
+def hdf_frame(
+    df, #one week of a cmc-scrape-results file, indexed by name
+    coin_ids, #(name, symbol) -> coinmarketcap id, see stored_coin_ids()
+    ):
+    """Return one week of an old object-dtype scrape file in the
+    cmcapi.listings_frame() layout.
+
+    The old files have no coinmarketcap ids: ids are looked up by
+    name and symbol, and are NaN for coins not in coin_ids.
+    Of rows sharing a coin key, the best-ranked is kept.
+    """
+    frame = pd.DataFrame(index=pd.Index(df.index.astype(str),name="name"))
+    for field in df.columns:
+        if field in ["symbol","last_updated"]:
+            frame[field] = df[field].astype(str).to_numpy()
+        elif field == "cmc_rank":
+            frame[field] = df[field].to_numpy(dtype=np.int64)
+        else:
+            frame[field] = pd.to_numeric(df[field]).to_numpy(dtype=float)
+    frame["id"] = coin_ids.reindex(pd.MultiIndex.from_arrays(
+        [frame.index,frame.symbol])).to_numpy(dtype=float)
+    frame = frame.sort_values("cmc_rank",kind="stable")
+    return frame[~pd.Index(coin_keys(frame)).duplicated()]
+
+def import_hdf_scrape(
+    hdf_path, #cmc-scrape-results*.hdf file
+    store=STORE,
+    coin_ids=None, #more (name, symbol) -> id, e.g. listings_coin_ids()
+    ):
+    """Copy the weeks of a cmc-scrape-results file the store does
+    not hold yet; return the imported YYYY-MM-DD weeks.
+
+    Coins found under a coinmarketcap id in the store (or coin_ids)
+    keep it (see hdf_frame()); the others are keyed
+    'name:<name>|<symbol>' in the coin book.
+    """
+    df = pd.read_hdf(hdf_path)
+    with _store_lock(store):
+        stored = set(stored_weeks(store))
+        ids = stored_coin_ids(store)
+        if coin_ids is not None:
+            ids = pd.concat([ids,coin_ids])
+            ids = ids[~ids.index.duplicated()]
+        listings = {
+            week: hdf_frame(frame.droplevel(0),ids)
+            for week,frame in df.groupby(level=0,sort=True)
+            if _day(week) not in stored
+            }
+        if listings:
+            write_weeks(listings,store=store)
+    return [_day(x) for x in listings]
+
+# -----------------------------------------------------
+# Read.
+# -----------------------------------------------------
+def read_panel(
+    start=None, #first week, inclusive
+    end=None, #last week, inclusive
+    max_rank=None, #only coins ranked max_rank or better
+    columns=None,
+    store=STORE,
+    ):
+    """Read stored weeks in the compact layout: a frame indexed by
+    (week, coin_id) with a categorical 'name' column."""
+    filters = []
+    if start is not None:
+        filters.append(("week",">=",pd.Timestamp(_day(start))))
+    if end is not None:
+        filters.append(("week","<=",pd.Timestamp(_day(end))))
+    if max_rank is not None:
+        filters.append(("cmc_rank","<=",int(max_rank)))
+    if columns is not None:
+        columns = ["week","coin_id","name"] + [
+            x for x in columns if x not in ["week","coin_id","name"]]
+    table = pq.read_table(
+        _listings_path(store),
+        columns=columns,
+        filters=filters or None,
+        read_dictionary=["name","symbol"],
+        )
+    return table.to_pandas().set_index(["week","coin_id"])
+
+def by_name(
+    panel, #read_panel() output
+    ):
+    """Return a panel in the scrape-results layout: indexed by (week,
+    name), like the cmc-scrape-results files. Coins sharing a name
+    share index entries; key coins by coin_id to tell them apart."""
+    df = panel.reset_index(level="coin_id",drop=True)
+    return df.set_index("name",append=True)
+
+def read_listings(**kwargs):
+    """read_panel() in the scrape-results layout, see by_name()."""
+    return by_name(read_panel(**kwargs))
@@ -0,0 +1,179 @@
+"""Parameter sweeps of data-explorer.py's rank-jump screen.
+
+The screen keeps coins whose monthly rank change jumped forward by at
+least 'cutoff' ranks, are currently ranked within [top_rank,
+bottom_rank], and mostly moved forward. sweep_screens() evaluates it
+for every combination of a parameter grid in a process pool. The rank
+and price matrices are written once as .npy files and memory-mapped
+read-only by every worker, so no worker receives a copy of them.
+"""
+import itertools
+import os
+import shutil
+import tempfile
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# screen parameters, in table index order, and data-explorer.py's
+# values:
+SCREEN_DEFAULTS = {
+    "cutoff": -100, #monthly rank change, negative moves forward
+    "window": "4W", #rank change period
+    "top_rank": 50,
+    "bottom_rank": 500,
+    }
+
+# summary statistics reported per selected coin:
+SCREEN_STATS = [
+    "rank",
+    "periods",
+    "jumps",
+    "largest_jump",
+    "largest_drop",
+    "price_change",
+    ]
+
+def rank_changes(
+    rankings, #week x coin rank matrix
+    window="4W",
+    ):
+    """Rank changes between the first ranks of consecutive windows."""
+    return rankings.resample(window).first().diff()
+
+def jump_screen(
+    rankings, #week x coin rank matrix
+    prices, #week x coin price matrix, same shape
+    current_week, #week giving the current rank and price
+    cutoff=SCREEN_DEFAULTS["cutoff"],
+    window=SCREEN_DEFAULTS["window"],
+    top_rank=SCREEN_DEFAULTS["top_rank"],
+    bottom_rank=SCREEN_DEFAULTS["bottom_rank"],
+    changes=None, #rank_changes(rankings,window), if already known
+    ):
+    """Return SCREEN_STATS of the coins passing the screen, indexed by
+    coin in column order.
+
+    price_change is the current price relative to the price at the
+    start of the window with the largest jump.
+    """
+    if changes is None:
+        changes = rank_changes(rankings,window)
+    dmc = changes.to_numpy()
+    current = rankings.loc[current_week].to_numpy()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore",RuntimeWarning)
+        periods = (~np.isnan(dmc)).sum(axis=0)
+        lowest = np.nanmin(dmc,axis=0)
+        highest = np.nanmax(dmc,axis=0)
+    third = np.sort(dmc,axis=0)[2] if len(dmc) > 2 else np.full(dmc.shape[1],np.nan)
+
+    keep = (
+        (lowest <= cutoff)
+        & (current >= top_rank)
+        & (current <= bottom_rank)
+        & (periods > 4)
+        & (np.abs(lowest) > 1.5*highest)
+        & (third <= 0.5*cutoff)
+        )
+    columns = np.flatnonzero(keep)
+
+    # price at the start of each coin's largest-jump window:
+    window_prices = prices.resample(window).first().to_numpy()
+    jump_rows = np.argmin(np.where(np.isnan(dmc[:,columns]),np.inf,dmc[:,columns]),axis=0)
+    jump_prices = window_prices[jump_rows,columns]
+    current_prices = prices.loc[current_week].to_numpy()[columns]
+
+    return pd.DataFrame(
+        {
+            "rank": current[columns],
+            "periods": periods[columns],
+            "jumps": (dmc[:,columns] <= cutoff).sum(axis=0),
+            "largest_jump": lowest[columns],
+            "largest_drop": highest[columns],
+            "price_change": current_prices/jump_prices - 1,
+            },
+        index=pd.Index(rankings.columns[columns],name="coin"),
+        )
+
+def parameter_grid(**grid):
+    """Expand {parameter: values} into a list of parameter dicts,
+    filling unlisted parameters from SCREEN_DEFAULTS."""
+    for name in grid:
+        if name not in SCREEN_DEFAULTS:
+            raise ValueError("unknown screen parameter '%s'; use %s"%(
+                name,list(SCREEN_DEFAULTS)))
+    values = [grid.get(x,[y]) for x,y in SCREEN_DEFAULTS.items()]
+    return [dict(zip(SCREEN_DEFAULTS,x)) for x in itertools.product(*values)]
+
+# -----------------------------------------------------
+# Process pool.
+# -----------------------------------------------------
+# each worker's read-only view of the shared matrices:
+_shared = {}
+
+def _attach(directory, weeks, coins, current_week):
+    """Pool initializer: map the shared matrices into frames."""
+    for name in ["rankings","prices"]:
+        values = np.load(os.path.join(directory,"%s.npy"%name),mmap_mode="r")
+        _shared[name] = pd.DataFrame(values,index=weeks,columns=coins,copy=False)
+    _shared["current_week"] = current_week
+    _changes.cache_clear()
+
+@lru_cache(maxsize=None)
+def _changes(window):
+    return rank_changes(_shared["rankings"],window)
+
+def _screen(params):
+    return jump_screen(
+        _shared["rankings"],
+        _shared["prices"],
+        _shared["current_week"],
+        changes=_changes(params["window"]),
+        **params,
+        )
+
+def sweep_screens(
+    rankings, #week x coin rank matrix
+    prices, #week x coin price matrix
+    current_week,
+    grid, #list of parameter dicts, see parameter_grid()
+    max_workers=None, #1 screens in this process
+    ):
+    """Run jump_screen() for every parameter set of the grid.
+
+    Returns one row per parameter set and selected coin, indexed by
+    the SCREEN_DEFAULTS parameters and coin, with SCREEN_STATS
+    columns. Parameter sets selecting no coin have no rows.
+    """
+    prices = prices.reindex(index=rankings.index,columns=rankings.columns)
+    weeks,coins = rankings.index,rankings.columns
+    # sorting by window lets a worker reuse its rank changes:
+    grid = sorted(grid,key=lambda x: x["window"])
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        for name,df in [("rankings",rankings),("prices",prices)]:
+            np.save(os.path.join(temp_dir,"%s.npy"%name),df.to_numpy(dtype=float))
+        initargs = (temp_dir,weeks,coins,pd.Timestamp(current_week))
+        if max_workers == 1:
+            _attach(*initargs)
+            results = [_screen(x) for x in grid]
+        else:
+            workers = max_workers or os.cpu_count()
+            chunksize = max(1,len(grid)//(4*workers))
+            with ProcessPoolExecutor(
+                workers,
+                initializer=_attach,
+                initargs=initargs,
+                ) as executor:
+                results = list(executor.map(_screen,grid,chunksize=chunksize))
+    finally:
+        _shared.clear()
+        shutil.rmtree(temp_dir)
+
+    keys = [tuple(x[y] for y in SCREEN_DEFAULTS) for x in grid]
+    return pd.concat(results,keys=keys,names=list(SCREEN_DEFAULTS))
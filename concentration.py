@@ -0,0 +1,152 @@
+"""Concentration of governance commitments.
+
+Every measure here comes from one descending sort of the commitments
+and its cumulative sum: the top-k share for every k, the Lorenz
+curve, the Gini coefficient and the Nakamoto coefficient. With no
+commitments (e.g. an empty filtered snapshot) shares, the Lorenz
+curve and the Gini coefficient are NaN and the Nakamoto coefficient
+is 0.
+"""
+import numpy as np
+import pandas as pd
+
+class concentration():
+    """Concentration measures of one set of commitments."""
+    def __init__(self, committed):
+        committed = np.asarray(committed,dtype=float)
+        committed = committed[~np.isnan(committed)]
+        self.sorted = -np.sort(-committed) #descending
+        self.cumulative = np.cumsum(self.sorted)
+        self.total = self.cumulative[-1] if len(committed) else 0.0
+
+    def __len__(self):
+        return len(self.sorted)
+
+    def top_share(self, k=None):
+        """Share of the total committed by the k largest accounts.
+
+        k may be an integer or an array of integers; by default the
+        share for every k = 1..n is returned.
+        """
+        if k is None:
+            return self.cumulative/self.total
+        if not len(self):
+            return np.full(np.shape(k),np.nan)
+        k = np.minimum(np.asarray(k),len(self))
+        return self.cumulative[k-1]/self.total
+
+    def lorenz(self):
+        """Return (population share, commitment share), smallest first."""
+        n = len(self)
+        if not n:
+            return np.array([np.nan]), np.array([np.nan])
+        ascending = np.concatenate([[0.0],np.cumsum(self.sorted[::-1])])
+        return np.arange(n+1)/n, ascending/self.total
+
+    def gini(self):
+        """Gini coefficient from the ranked commitments."""
+        n = len(self)
+        if not n:
+            return np.nan
+        ascending = self.sorted[::-1]
+        ranks = np.arange(1,n+1)
+        return 2.0*np.dot(ranks,ascending)/(n*self.total) - (n+1.0)/n
+
+    def nakamoto(self, threshold=0.5):
+        """Fewest accounts that together commit more than 'threshold'
+        of the total."""
+        if not len(self):
+            return 0
+        return int(np.searchsorted(
+            self.cumulative,
+            threshold*self.total,
+            side="right",
+            )) + 1
+
+def concentration_table(
+    snapshots, #dict label -> committed algos (array or series)
+    cutoffs,
+    threshold=0.5,
+    ):
+    """Top-k shares at 'cutoffs' plus Gini and Nakamoto coefficients,
+    one column per snapshot."""
+    columns = {}
+    for label,committed in snapshots.items():
+        c = concentration(committed)
+        columns[label] = np.concatenate([
+            c.top_share(cutoffs),
+            [c.gini(),c.nakamoto(threshold)],
+            ])
+    index = ["top %d"%k for k in cutoffs] + ["gini","nakamoto"]
+    return pd.DataFrame(columns,index=index)
+
+# -----------------------------------------------------
+# Top-k whales.
+# -----------------------------------------------------
+def top_k(committed, k):
+    """Positions of the k largest commitments, largest first.
+
+    Partial selection (np.argpartition) is O(n); only the k selected
+    values are sorted.
+    """
+    committed = np.asarray(committed,dtype=float)
+    k = min(k,len(committed))
+    if k == 0:
+        return np.array([],dtype=int)
+    top = np.argpartition(-committed,k-1)[:k]
+    return top[np.argsort(-committed[top],kind="stable")]
+
+class whaletracker():
+    """Top-k committed addresses of a stream of snapshots."""
+    def __init__(self, k=25):
+        self.k = k
+        self.whales = {}
+
+    def ingest(
+        self,
+        label, #e.g. the snapshot date
+        address_ids,
+        committed,
+        ):
+        """Add a snapshot; return its whales frame.
+
+        The frame is indexed by rank (1 = largest) and holds the
+        address id, its commitment and its share of the snapshot
+        total.
+        """
+        address_ids = np.asarray(address_ids)
+        committed = np.asarray(committed,dtype=float)
+        top = top_k(committed,self.k)
+        whales = pd.DataFrame(
+            {
+                "address_id": address_ids[top],
+                "committed_algos": committed[top],
+                "ratio": committed[top]/committed.sum(),
+                },
+            index=pd.RangeIndex(1,len(top)+1,name="rank"),
+            )
+        self.whales[label] = whales
+        return whales
+
+    def ranks(self):
+        """Whale rank per address (rows) and snapshot (columns)."""
+        return pd.DataFrame({
+            label: pd.Series(whales.index,index=whales.address_id)
+            for label,whales in self.whales.items()
+            })
+
+    def movement(self, left, right):
+        """Rank movement of the whales of two snapshots.
+
+        'status' is 'entered' or 'exited' for addresses in only one
+        top k, else 'stayed'; rank_change > 0 means moved up.
+        """
+        ranks = self.ranks()[[left,right]].dropna(how="all")
+        ranks.columns = ["rank_left","rank_right"]
+        ranks["rank_change"] = ranks.rank_left - ranks.rank_right
+        ranks["status"] = np.select(
+            [ranks.rank_left.isna(),ranks.rank_right.isna()],
+            ["entered","exited"],
+            default="stayed",
+            )
+        return ranks.sort_values(["rank_right","rank_left"])
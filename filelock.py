@@ -0,0 +1,60 @@
+"""Exclusive lock on a lock file, shared by threads and processes.
+
+The stores read, extend and rewrite shared files (id books, metrics
+tables); a filelock around each read-modify-write keeps two scripts
+running at once from overwriting each other's additions. Locks are
+flock() locks where fcntl is available; elsewhere only threads of one
+process are serialized.
+"""
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# lock state per lock file path, shared by every filelock of
+# the path in this process:
+_states = {}
+_registry_lock = threading.Lock()
+
+class _lockstate():
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.fi = None
+        self.depth = 0
+
+class filelock():
+    """Context manager holding an exclusive lock on 'path'; the
+    holding thread may re-enter it."""
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        with _registry_lock:
+            self._state = _states.setdefault(self.path,_lockstate())
+
+    def __enter__(self):
+        state = self._state
+        state.thread_lock.acquire()
+        if state.depth == 0 and fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.path),exist_ok=True)
+                state.fi = open(self.path,"a")
+                fcntl.flock(state.fi.fileno(),fcntl.LOCK_EX)
+            except BaseException:
+                if state.fi is not None:
+                    state.fi.close()
+                    state.fi = None
+                state.thread_lock.release()
+                raise
+        state.depth += 1
+        return self
+
+    def __exit__(self, *args):
+        state = self._state
+        state.depth -= 1
+        if state.depth == 0 and state.fi is not None:
+            fcntl.flock(state.fi.fileno(),fcntl.LOCK_UN)
+            state.fi.close()
+            state.fi = None
+        state.thread_lock.release()
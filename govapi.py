@@ -0,0 +1,426 @@
+"""Algorand governance API client.
+
+The governors endpoint returns 100 rows per offset page. Pages are
+fetched over a small pool of keep-alive HTTP connections with a
+bounded number of pages in flight, instead of one curl process
+(and one TLS handshake) per page.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# personal modules:
+from webclient import apierror, connectionpool, iter_pages, ratelimiter
+
+# default API root and page size:
+GOVERNANCE_API = "https://governance.algorand.foundation/api"
+PAGE_LIMIT = 100
+
+# -----------------------------------------------------
+# Governors endpoint.
+# -----------------------------------------------------
+def governors_url(
+    governance_period, #integer
+    offset, #integer
+    limit=PAGE_LIMIT,
+    api=GOVERNANCE_API,
+    ):
+    url = [
+        api,
+        "periods/governance-period-%d/governors"%governance_period,
+        "?ordering=-registration_datetime&limit=%d&offset=%d"%(limit,offset),
+        ]
+    return "/".join(url)
+
+def iter_governor_pages(
+    governance_period, #integer
+    start_page=0,
+    max_number_of_pages=800,
+    max_in_flight=8,
+    api=GOVERNANCE_API,
+    pool=None,
+    verbose=True,
+    ):
+    """Yield (page number, results) in page order.
+
+    Up to max_in_flight pages ahead of the consumer are requested
+    concurrently. Iteration stops after the first short page (fewer
+    than PAGE_LIMIT rows), or when the consumer stops iterating;
+    speculative requests beyond that point are discarded.
+    """
+    own_pool = pool is None
+    if own_pool:
+        pool = connectionpool(api,maxsize=max_in_flight)
+
+    def fetch(page):
+        url = governors_url(governance_period,page*PAGE_LIMIT,api=api)
+        if verbose:
+            print(url)
+        return json.loads(pool.get(url))["results"]
+
+    pages = iter_pages(
+        fetch,
+        lambda results: len(results) < PAGE_LIMIT,
+        start_page=start_page,
+        max_pages=max_number_of_pages,
+        max_in_flight=max_in_flight,
+        )
+    try:
+        for page,results in pages:
+            yield page, results
+            if verbose and len(results) < PAGE_LIMIT:
+                print("final page: %d"%page)
+    finally:
+        pages.close()
+        if own_pool:
+            pool.close()
+
+def fetch_governors(
+    governance_period, #integer
+    **kwargs
+    ):
+    """Return every governor 'results' item of a governance period."""
+    return [
+        item
+        for _,results in iter_governor_pages(governance_period,**kwargs)
+        for item in results
+        ]
+
+def governor_url(
+    governance_period, #integer
+    address,
+    api=GOVERNANCE_API,
+    ):
+    return "%s/periods/governance-period-%d/governors/%s/"%(
+        api,
+        governance_period,
+        address,
+        )
+
+def fetch_governor_details(
+    governance_period, #integer
+    addresses,
+    max_in_flight=8,
+    api=GOVERNANCE_API,
+    pool=None,
+    ):
+    """Return the current 'results' item of each address."""
+    own_pool = pool is None
+    if own_pool:
+        pool = connectionpool(api,maxsize=max_in_flight)
+    def fetch(address):
+        return json.loads(pool.get(governor_url(governance_period,address,api=api)))
+    try:
+        with ThreadPoolExecutor(max_in_flight) as executor:
+            return list(executor.map(fetch,addresses))
+    finally:
+        if own_pool:
+            pool.close()
+
+# -----------------------------------------------------
+# Governor data frames.
+# -----------------------------------------------------
+class governorcolumns():
+    """Governor 'results' items decoded into preallocated typed columns.
+
+    Pages are appended with extend(); each field is pulled out of the
+    page in one pass and written straight into its column:
+    fixed-width address bytes, datetime64 registration (UTC),
+    int64 microalgos and bool eligibility.
+    """
+    def __init__(self, capacity=800*PAGE_LIMIT):
+        self.size = 0
+        self.address = np.empty(capacity,dtype="S58")
+        self.registration = np.empty(capacity,dtype="datetime64[us]")
+        self.microalgos = np.empty(capacity,dtype=np.int64)
+        self.eligible = np.empty(capacity,dtype=bool)
+
+    def _grow(self, capacity):
+        for name in ["address","registration","microalgos","eligible"]:
+            column = getattr(self,name)
+            grown = np.empty(capacity,dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self,name,grown)
+
+    def extend(self, results):
+        n = len(results)
+        if self.size + n > self.address.shape[0]:
+            self._grow(max(2*self.address.shape[0],self.size+n))
+        rows = slice(self.size,self.size+n)
+        self.address[rows] = [x["account"]["address"] for x in results]
+        self.registration[rows] = [
+            x["registration_datetime"].rstrip("Z") for x in results]
+        self.microalgos[rows] = np.asarray(
+            [x["committed_algo_amount"] for x in results]).astype(np.int64)
+        self.eligible[rows] = [x["is_eligible"] for x in results]
+        self.size += n
+        return self
+
+    def to_frame(self):
+        """Return the snapshot dataframe layout (committed_algos in Algo)."""
+        n = self.size
+        return pd.DataFrame({
+            "address": self.address[:n].astype(str),
+            "registration": pd.DatetimeIndex(
+                self.registration[:n]).tz_localize("UTC"),
+            "committed_algos": self.microalgos[:n]/1e6,
+            "eligible": self.eligible[:n].copy(),
+            })
+
+def governors_frame(results):
+    """Convert 'results' items to the snapshot dataframe layout."""
+    return governorcolumns(len(results)).extend(results).to_frame()
+
+def fetch_governor_columns(
+    governance_period, #integer
+    checkpoint=None, #crawlcheckpoint to resume from and append to
+    **kwargs
+    ):
+    """Fetch a governance period, decoding each page as it arrives."""
+    columns = governorcolumns()
+    start_page = 0
+    if checkpoint is not None:
+        finished = False
+        for page,results in checkpoint.pages():
+            columns.extend(results)
+            start_page = page + 1
+            finished = len(results) < PAGE_LIMIT
+        if finished:
+            return columns
+        if start_page and kwargs.get("verbose",True):
+            print("resuming governance period %d at page %d"%(
+                governance_period,start_page))
+    pages = iter_governor_pages(
+        governance_period,
+        start_page=start_page,
+        **kwargs
+        )
+    for page,results in pages:
+        if checkpoint is not None:
+            checkpoint.append(page,results)
+        columns.extend(results)
+    return columns
+
+# -----------------------------------------------------
+# Crawl checkpoints.
+# -----------------------------------------------------
+class crawlcheckpoint():
+    """Append-only log of the pages fetched so far in a crawl.
+
+    One JSON line per page, flushed to disk as each page arrives; the
+    page number of the last line is the offset cursor. A line cut
+    short by a killed process is ignored on resume.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def pages(self):
+        """Yield the (page, results) pairs saved so far, in order.
+
+        Anything after the last good line is truncated away so that
+        new pages are appended right behind it.
+        """
+        if not os.path.exists(self.path):
+            return
+        expected_page = 0
+        good_bytes = 0
+        with open(self.path,"rb+") as fi:
+            for line in fi:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n") or entry["page"] != expected_page:
+                    break
+                yield entry["page"], entry["results"]
+                expected_page += 1
+                good_bytes += len(line)
+            fi.truncate(good_bytes)
+
+    def append(self, page, results):
+        os.makedirs(os.path.dirname(self.path) or ".",exist_ok=True)
+        with open(self.path,"a") as of:
+            of.write(json.dumps({"page": page,"results": results})+"\n")
+            of.flush()
+            os.fsync(of.fileno())
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+# -----------------------------------------------------
+# Snapshot sync.
+# -----------------------------------------------------
+def sync_governors(
+    governance_period, #integer
+    snapshot, #dataframe in the governors_frame layout
+    recheck=(), #known addresses to re-query, one request each
+    max_in_flight=8,
+    pages_in_flight=2,
+    api=GOVERNANCE_API,
+    pool=None,
+    verbose=True,
+    ):
+    """Return an updated copy of a snapshot and the number of pages read.
+
+    Pages are read newest registration first and reading stops at
+    the first registration already present in the snapshot; every
+    row from that point on is known. Known addresses keep their
+    registration and the snapshot's is_eligible and
+    committed_algo_amount, which may be stale: only the addresses in
+    'recheck' are re-queried, one request each, through the
+    per-governor route (governors/<address>/). That route is assumed
+    from the paged route and unverified; an address it does not know
+    raises apierror (404). A weekly delta usually fits in the first
+    page or two, so fewer pages are requested ahead (pages_in_flight)
+    than detail lookups.
+    """
+    known = dict(zip(snapshot.address,snapshot.registration))
+    own_pool = pool is None
+    if own_pool:
+        pool = connectionpool(api,maxsize=max_in_flight)
+    new_results = []
+    pages_read = 0
+    try:
+        pages = iter_governor_pages(
+            governance_period,
+            max_in_flight=pages_in_flight,
+            api=api,
+            pool=pool,
+            verbose=verbose,
+            )
+        try:
+            for _,results in pages:
+                pages_read += 1
+                for item in results:
+                    registration = known.get(item["account"]["address"])
+                    if (registration is not None and registration
+                        == pd.Timestamp(item["registration_datetime"])):
+                        break
+                    new_results.append(item)
+                else:
+                    continue
+                break
+        finally:
+            pages.close()
+        recheck = [x for x in recheck or () if x in known]
+        rechecked = fetch_governor_details(
+            governance_period,
+            recheck,
+            max_in_flight=max_in_flight,
+            api=api,
+            pool=pool,
+            )
+    finally:
+        if own_pool:
+            pool.close()
+
+    # new registrations (and re-registrations of known
+    # addresses) replace any existing row:
+    new = governors_frame(new_results)
+    df = pd.concat(
+        [new,snapshot[~snapshot.address.isin(new.address)]],
+        ignore_index=True,
+        )
+
+    # refresh eligibility and commitment of rechecked addresses:
+    if rechecked:
+        updates = governors_frame(rechecked).set_index("address")
+        df = df.set_index("address",drop=False)
+        rows = updates.index.intersection(df.index)
+        df.loc[rows,"eligible"] = updates.loc[rows,"eligible"]
+        df.loc[rows,"committed_algos"] = updates.loc[rows,"committed_algos"]
+        df = df.reset_index(drop=True)
+    if verbose:
+        print("%d new registrations in %d pages, %d rechecked"%(
+            new.shape[0],pages_read,len(rechecked)))
+    return df, pages_read
+
+# -----------------------------------------------------
+# Multi-period crawl.
+# -----------------------------------------------------
+def crawl_periods(
+    periods, #list of integers
+    snapshots=None, #period -> last snapshot, for a delta sync
+    recheck=None, #period -> known addresses to recheck
+    requests_per_second=10.0,
+    max_in_flight=8,
+    on_period=None, #callback(period, dataframe)
+    checkpoint_dir=None, #resume full crawls from page checkpoints
+    api=GOVERNANCE_API,
+    verbose=True,
+    **kwargs
+    ):
+    """Crawl several governance periods concurrently; return {period: df}.
+
+    Every period shares one connection pool and one request budget
+    for the host: at most requests_per_second, and max_in_flight
+    requests at a time across all periods. A period with an entry in
+    'snapshots' is delta-synced (see sync_governors(); rows not in
+    'recheck' keep stale eligibility and commitment), the others are
+    fetched in full; a delta sync that the per-governor route answers
+    with 404 falls back to a full crawl of its period.
+    on_period runs as soon as a period finishes, e.g. to write its
+    partition. With a checkpoint_dir, full crawls log every page
+    there and resume from the last good page; a period's checkpoint
+    is removed once on_period has returned.
+    """
+    snapshots = snapshots or {}
+    recheck = recheck or {}
+    budget = ratelimiter(
+        requests_per_second,
+        burst=max_in_flight,
+        max_concurrent=max_in_flight,
+        )
+    pool = connectionpool(api,maxsize=max_in_flight,limiter=budget)
+
+    def crawl(governance_period):
+        checkpoint = None
+        df = None
+        if governance_period in snapshots:
+            try:
+                df,_ = sync_governors(
+                    governance_period,
+                    snapshots[governance_period],
+                    recheck=recheck.get(governance_period),
+                    max_in_flight=max_in_flight,
+                    api=api,
+                    pool=pool,
+                    verbose=verbose,
+                    )
+            except apierror as error:
+                if error.status != 404:
+                    raise
+                if verbose:
+                    print("period %d: %s; crawling in full"%(
+                        governance_period,error))
+        if df is None:
+            if checkpoint_dir is not None:
+                checkpoint = crawlcheckpoint(os.path.join(
+                    checkpoint_dir,
+                    "governance-period-%d.jsonl"%governance_period,
+                    ))
+            df = fetch_governor_columns(
+                governance_period,
+                checkpoint=checkpoint,
+                max_in_flight=max_in_flight,
+                api=api,
+                pool=pool,
+                verbose=verbose,
+                **kwargs
+                ).to_frame()
+        if on_period is not None:
+            on_period(governance_period,df)
+        if checkpoint is not None:
+            checkpoint.remove()
+        return df
+
+    try:
+        with ThreadPoolExecutor(max(1,len(periods))) as executor:
+            futures = {p: executor.submit(crawl,p) for p in periods}
+        return {p: f.result() for p,f in futures.items()}
+    finally:
+        pool.close()
@@ -0,0 +1,381 @@
+"""Governance snapshot analytics.
+
+Snapshots are compared on the integer address ids of the governance
+store (govstore.py): every snapshot of a period is laid out on one
+shared, sorted address axis, so per-address comparisons between any
+two snapshots are plain array operations.
+"""
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------
+# Snapshot diff.
+# -----------------------------------------------------
+# per-address outcomes between two snapshots, in order of
+# precedence:
+OUTCOMES = [
+    "joined", #only in the later snapshot
+    "left", #only in the earlier snapshot
+    "became_ineligible",
+    "became_eligible",
+    "increased", #committed algos
+    "decreased",
+    "unchanged",
+    ]
+
+def classify(
+    committed_left, #nan where the address is absent
+    committed_right,
+    eligible_left,
+    eligible_right,
+    ):
+    """Return the OUTCOMES index of every address as an int8 array."""
+    in_left = ~np.isnan(committed_left)
+    in_right = ~np.isnan(committed_right)
+    with np.errstate(invalid="ignore"):
+        return np.select(
+            [
+                ~in_left,
+                ~in_right,
+                eligible_left & ~eligible_right,
+                ~eligible_left & eligible_right,
+                committed_right > committed_left,
+                committed_right < committed_left,
+                ],
+            np.arange(6),
+            default=6,
+            ).astype(np.int8)
+
+class snapshotpanel():
+    """Snapshots aligned on a shared sorted address axis.
+
+    'snapshots' maps a label (e.g. the snapshot date) to a snapshot
+    frame with key, committed_algos and eligible columns.
+    """
+    def __init__(
+        self,
+        snapshots, #dict label -> dataframe
+        key="address_id",
+        ):
+        self.labels = list(snapshots)
+        frames = [snapshots[x] for x in self.labels]
+        self.addresses = np.unique(np.concatenate(
+            [f[key].to_numpy() for f in frames]))
+        shape = (len(frames),len(self.addresses))
+        self.committed = np.full(shape,np.nan)
+        self.eligible = np.zeros(shape,dtype=bool)
+        for i,f in enumerate(frames):
+            columns = np.searchsorted(self.addresses,f[key].to_numpy())
+            self.committed[i,columns] = f.committed_algos.to_numpy()
+            self.eligible[i,columns] = f.eligible.to_numpy()
+        self.key = key
+
+    def _rows(self, left, right):
+        return self.labels.index(left), self.labels.index(right)
+
+    def outcomes(self, left, right):
+        """Return the int8 outcome code of every address on the axis."""
+        i,j = self._rows(left,right)
+        return classify(
+            self.committed[i],
+            self.committed[j],
+            self.eligible[i],
+            self.eligible[j],
+            )
+
+    def diff(self, left, right):
+        """Per-address comparison of two snapshots."""
+        i,j = self._rows(left,right)
+        present = ~(np.isnan(self.committed[i]) & np.isnan(self.committed[j]))
+        codes = self.outcomes(left,right)[present]
+        df = pd.DataFrame(
+            {
+                "committed_left": self.committed[i,present],
+                "committed_right": self.committed[j,present],
+                "eligible_left": self.eligible[i,present],
+                "eligible_right": self.eligible[j,present],
+                "outcome": pd.Categorical.from_codes(codes,OUTCOMES),
+                },
+            index=pd.Index(self.addresses[present],name=self.key),
+            )
+        df["delta"] = (
+            df.committed_right.fillna(0.0)
+            - df.committed_left.fillna(0.0)
+            )
+        return df
+
+    def flows(self, left, right):
+        """Address count and committed algos moved per outcome."""
+        i,j = self._rows(left,right)
+        codes = self.outcomes(left,right)
+        present = ~(np.isnan(self.committed[i]) & np.isnan(self.committed[j]))
+        codes = codes[present]
+        committed_left = np.nan_to_num(self.committed[i,present])
+        committed_right = np.nan_to_num(self.committed[j,present])
+        n = len(OUTCOMES)
+        df = pd.DataFrame(
+            {
+                "count": np.bincount(codes,minlength=n),
+                "committed_left": np.bincount(
+                    codes,weights=committed_left,minlength=n),
+                "committed_right": np.bincount(
+                    codes,weights=committed_right,minlength=n),
+                },
+            index=pd.Index(OUTCOMES,name="outcome"),
+            )
+        df["net"] = df.committed_right - df.committed_left
+        return df
+
+    def pairwise_flows(self, pairs=None):
+        """flows() for every (left, right) pair; all ordered pairs of
+        labels by default."""
+        if pairs is None:
+            pairs = [
+                (x,y)
+                for i,x in enumerate(self.labels)
+                for y in self.labels[i+1:]
+                ]
+        return pd.concat(
+            [self.flows(x,y) for x,y in pairs],
+            keys=pairs,
+            names=["left","right"],
+            )
+
+def snapshot_diff(left, right, key="address_id"):
+    """Per-address outcomes between two snapshot frames."""
+    return snapshotpanel({"left": left,"right": right},key=key).diff(
+        "left","right")
+
+def snapshot_flows(left, right, key="address_id"):
+    """Aggregate flows between two snapshot frames."""
+    return snapshotpanel({"left": left,"right": right},key=key).flows(
+        "left","right")
+
+# -----------------------------------------------------
+# Multi-slice summary statistics.
+# -----------------------------------------------------
+def slice_summary(
+    df,
+    slices, #dict name -> boolean mask over the rows of df
+    columns=("committed_algos",),
+    quantiles=(0.25,0.5,0.75),
+    ):
+    """describe() statistics plus 'sum' for every slice at once.
+
+    Counts, sums, means and standard deviations of all slices come
+    from one matrix product of the slice masks with the values, and
+    each column is sorted once for the min, max and quantiles of
+    every slice. Columns must not hold missing values. Returns a
+    frame indexed by (slice, statistic).
+    """
+    names = list(slices)
+    columns = list(columns)
+    masks = np.vstack([np.asarray(slices[x],dtype=bool) for x in names])
+    weights = masks.astype(float)
+    values = df[columns].to_numpy(dtype=float)
+
+    # moments; values are shifted by the column means first so the
+    # variance does not lose precision to large means:
+    counts = weights.sum(axis=1)[:,None]
+    sums = weights @ values
+    shifted = values - values.mean(axis=0)
+    shifted_sums = weights @ shifted
+    with np.errstate(invalid="ignore",divide="ignore"):
+        means = sums/counts
+        variance = (weights @ shifted**2 - shifted_sums**2/counts)/(counts-1)
+    std = np.sqrt(np.maximum(variance,0.0))
+
+    # order statistics, linearly interpolated like describe():
+    probabilities = np.concatenate([[0.0],quantiles,[1.0]])
+    order_stats = np.full((len(names),len(probabilities),len(columns)),np.nan)
+    for j in range(len(columns)):
+        order = np.argsort(values[:,j],kind="stable")
+        ordered = values[order,j]
+        for i in range(len(names)):
+            selected = ordered[masks[i,order]]
+            if len(selected) == 0:
+                continue
+            position = probabilities*(len(selected)-1)
+            below = np.floor(position).astype(int)
+            above = np.ceil(position).astype(int)
+            fraction = position - below
+            order_stats[i,:,j] = (
+                selected[below]*(1.0-fraction) + selected[above]*fraction)
+
+    quantile_names = ["%g%%"%(100*q) for q in quantiles]
+    stats = ["count","mean","std","min"] + quantile_names + ["max","sum"]
+    blocks = []
+    for i in range(len(names)):
+        blocks.append(np.vstack([
+            np.repeat(counts[i],len(columns)),
+            means[i],
+            std[i],
+            order_stats[i],
+            sums[i],
+            ]))
+    return pd.DataFrame(
+        np.vstack(blocks),
+        index=pd.MultiIndex.from_product([names,stats],names=["slice","stat"]),
+        columns=columns,
+        )
+
+def describe_sheet(
+    summary, #slice_summary() output
+    slices, #slice names to include, in order
+    keys=None, #row labels of the slices on the sheet
+    sum_column="committed_algos",
+    ):
+    """Lay slices out like the governance.xlsx sheets: one describe()
+    block per slice with a 'sum' column of sum_column's total."""
+    frames = []
+    for name in slices:
+        block = summary.loc[name]
+        f = block.drop(index="sum").rename_axis(None)
+        f["sum"] = block.loc["sum",sum_column]
+        frames.append(f)
+    return pd.concat(frames,keys=keys or list(slices))
+
+# -----------------------------------------------------
+# Drop-out hazard and reward rate projection.
+# -----------------------------------------------------
+# committed algos bucket edges:
+COMMITMENT_BUCKETS = [0.0,1e2,1e3,1e4,1e5,1e6,np.inf]
+
+def commitment_bucket(committed, edges=COMMITMENT_BUCKETS):
+    """Return the bucket index of every commitment (nan -> -1)."""
+    committed = np.asarray(committed,dtype=float)
+    bucket = np.searchsorted(edges,committed,side="right") - 1
+    bucket = np.minimum(bucket,len(edges)-2)
+    return np.where(np.isnan(committed),-1,bucket)
+
+def bucket_labels(edges=COMMITMENT_BUCKETS):
+    return ["%g-%g"%(a,b) for a,b in zip(edges[:-1],edges[1:])]
+
+def dropout_hazard(
+    panel, #snapshotpanel labelled by snapshot date
+    edges=COMMITMENT_BUCKETS,
+    ):
+    """Daily drop-out hazard of eligible governors per commitment
+    bucket, pooled over consecutive snapshots.
+
+    A governor eligible in one snapshot drops out when it is
+    ineligible or gone in the next. The hazard is the exponential
+    rate events/exposure, where drop-outs count half the interval
+    as exposure. Buckets are set by the earlier commitment.
+    """
+    n = len(edges) - 1
+    events = np.zeros(n)
+    exposure = np.zeros(n)
+    dates = pd.to_datetime(panel.labels)
+    for i in range(len(panel.labels)-1):
+        days = (dates[i+1] - dates[i]).days
+        at_risk = panel.eligible[i]
+        dropped = at_risk & ~panel.eligible[i+1]
+        bucket = commitment_bucket(panel.committed[i,at_risk],edges)
+        dropped_bucket = commitment_bucket(panel.committed[i,dropped],edges)
+        counts = np.bincount(bucket,minlength=n)
+        drops = np.bincount(dropped_bucket,minlength=n)
+        events += drops
+        exposure += days*(counts - 0.5*drops)
+    with np.errstate(invalid="ignore",divide="ignore"):
+        hazard = events/exposure
+    return pd.DataFrame(
+        {"events": events,"exposure_days": exposure,"hazard": hazard},
+        index=pd.Index(bucket_labels(edges),name="committed_algos"),
+        )
+
+def project_reward_rate(
+    committed, #eligible governors' committed algos
+    dropout_probability, #per governor, until the end of the period
+    reward_pool,
+    simulations=200000,
+    exact=2000, #largest governors simulated one by one
+    batch_size=5000,
+    seed=0,
+    ):
+    """Simulated end-of-period reward rates, 1 + pool/committed.
+
+    The 'exact' largest governors are drawn as independent
+    Bernoulli outcomes in batched uniform draws. The remaining many
+    small governors are summed by the central limit theorem: one
+    normal draw per simulation with their exact mean and variance.
+    """
+    committed = np.asarray(committed,dtype=float)
+    p = np.asarray(dropout_probability,dtype=float)
+    order = np.argsort(-committed,kind="stable")
+    top,rest = order[:exact],order[exact:]
+    rest_mean = np.sum((1.0-p[rest])*committed[rest])
+    rest_std = np.sqrt(np.sum(p[rest]*(1.0-p[rest])*committed[rest]**2))
+
+    rng = np.random.default_rng(seed)
+    top_committed = committed[top].astype(np.float32)
+    top_p = p[top].astype(np.float32)
+    totals = np.empty(simulations)
+    for start in range(0,simulations,batch_size):
+        stop = min(start+batch_size,simulations)
+        stays = rng.random((stop-start,len(top)),dtype=np.float32) >= top_p
+        totals[start:stop] = (
+            stays.astype(np.float32) @ top_committed
+            + rng.normal(rest_mean,rest_std,stop-start)
+            )
+    return 1.0 + reward_pool/totals
+
+# -----------------------------------------------------
+# Eligibility survival.
+# -----------------------------------------------------
+def time_to_ineligibility(panel):
+    """Per-address time from first eligible snapshot to the first
+    snapshot seen ineligible (or gone).
+
+    Returns a frame indexed by address with the entry commitment,
+    the days observed and whether ineligibility was observed
+    (event) or the governor was still eligible in the last snapshot
+    (censored). Never-eligible addresses are left out.
+    """
+    eligible = panel.eligible
+    t = np.arange(len(panel.labels))[:,None]
+    ever = eligible.any(axis=0)
+    entry = eligible.argmax(axis=0)
+    failed = ~eligible & (t > entry)
+    event = failed.any(axis=0)
+    last = np.where(event,failed.argmax(axis=0),len(panel.labels)-1)
+    days = pd.to_datetime(panel.labels).to_numpy()
+    columns = np.arange(len(panel.addresses))
+    return pd.DataFrame(
+        {
+            "committed_algos": panel.committed[entry,columns][ever],
+            "entry": np.asarray(panel.labels)[entry[ever]],
+            "days": ((days[last] - days[entry])/np.timedelta64(1,"D"))[ever],
+            "event": event[ever],
+            },
+        index=pd.Index(panel.addresses[ever],name=panel.key),
+        )
+
+def eligibility_survival(
+    panel, #snapshotpanel labelled by snapshot date
+    edges=COMMITMENT_BUCKETS,
+    ):
+    """Kaplan-Meier table of time-to-ineligibility per commitment
+    bucket (set by the commitment when first eligible).
+
+    One row per bucket and observed time in days with the governors
+    at risk, the events, the censored governors, the hazard and the
+    survival probability.
+    """
+    df = time_to_ineligibility(panel)
+    df["bucket"] = pd.Categorical.from_codes(
+        commitment_bucket(df.committed_algos,edges),
+        bucket_labels(edges),
+        )
+    df["censored"] = ~df.event
+    table = df.groupby(["bucket","days"],observed=True)[
+        ["event","censored"]].sum().rename(columns={"event": "events"})
+    table["leaving"] = table.events + table.censored
+    # at risk: every governor of the bucket whose time is at least
+    # this row's:
+    table["at_risk"] = table.leaving.iloc[::-1].groupby(
+        level="bucket",observed=True).cumsum().iloc[::-1]
+    table["hazard"] = table.events/table.at_risk
+    table["survival"] = (1.0-table.hazard).groupby(
+        level="bucket",observed=True).cumprod()
+    return table[["at_risk","events","censored","hazard","survival"]]
@@ -0,0 +1,427 @@
+"""Partitioned columnar store for governance snapshots.
+
+Every snapshot is one parquet file in a hive-style dataset:
+
+    bin/governance/period=N/date=YYYY-MM-DD/snapshot.parquet
+
+Addresses are dictionary-encoded and rows are sorted by committed
+Algo, so row-group statistics let filters on eligibility, commitment
+and date skip data instead of loading whole snapshots.
+
+Every address also gets a permanent int32 id from the address book
+(bin/governance/addresses.parquet) shared by all periods and dates.
+Snapshots carry it as 'address_id', so joins, overlap counts and set
+differences between snapshots are integer array operations.
+
+Headline numbers of every snapshot (governor counts, committed Algo,
+reward rate) are kept in a small metrics table,
+bin/governance/metrics.parquet, one row per (period, date). A row is
+written together with its snapshot, so tables and trend plots never
+need to read the snapshots themselves.
+
+Every snapshot also gets quantile sketches of its committed Algo
+(quantilesketch.py), for all and for eligible governors, kept in
+bin/governance/sketches.parquet. Merged sketches answer percentiles
+across dates and periods within SKETCH_ACCURACY without reading any
+snapshot.
+"""
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+# personal modules:
+from filelock import filelock
+from idbook import idbook
+from quantilesketch import quantilesketch
+
+# default store location, shared by every post directory:
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE = os.path.join(REPO_DIR,"bin","governance")
+
+# snapshot columns as written by govapi.governors_frame:
+COLUMNS = [
+    "address",
+    "registration",
+    "committed_algos",
+    "eligible",
+    ]
+SNAPSHOT_COLUMNS = COLUMNS + ["address_id"]
+
+# governance rewards pool per period [algos]:
+REWARD_POOLS = {
+    1: 60.0e6,
+    2: 70.5e6,
+    }
+
+# last day of each governance period:
+PERIOD_ENDS = {
+    1: "2021-12-31",
+    2: "2022-03-31",
+    }
+
+# relative accuracy of the committed algos sketches:
+SKETCH_ACCURACY = 0.005
+
+# partition keys:
+PARTITIONING = ds.partitioning(
+    pa.schema([("period",pa.int32()),("date",pa.string())]),
+    flavor="hive",
+    )
+
+# -----------------------------------------------------
+# Address book.
+# -----------------------------------------------------
+class addressbook(idbook):
+    """Append-only address <-> int32 id dictionary."""
+    def __init__(self, store=STORE):
+        idbook.__init__(self,os.path.join(store,"addresses.parquet"),"address")
+
+# serializes address book, metrics and sketch updates
+# between concurrent writers, threads and processes alike:
+def _store_lock(store):
+    """The address book is read, extended and saved under this lock."""
+    return filelock(os.path.join(store,"_store.lock"))
+
+def overlap(left_ids, right_ids):
+    """Return the sorted ids present in both id arrays."""
+    return np.intersect1d(left_ids,right_ids)
+
+def difference(left_ids, right_ids):
+    """Return the sorted ids of left_ids not present in right_ids."""
+    return np.setdiff1d(left_ids,right_ids)
+
+def align(left_ids, right_ids):
+    """Return positions (left, right) of the ids present in both.
+
+    left_ids[left] == right_ids[right], ordered by id; each id array
+    must be unique, as it is within one snapshot.
+    """
+    left_ids = np.asarray(left_ids)
+    right_ids = np.asarray(right_ids)
+    left_order = np.argsort(left_ids,kind="stable")
+    right_order = np.argsort(right_ids,kind="stable")
+    left_sorted = left_ids[left_order]
+    right_sorted = right_ids[right_order]
+    _,left_common,right_common = np.intersect1d(
+        left_sorted,
+        right_sorted,
+        assume_unique=True,
+        return_indices=True,
+        )
+    return left_order[left_common], right_order[right_common]
+
+# -----------------------------------------------------
+# Write.
+# -----------------------------------------------------
+def partition_path(
+    governance_period, #integer
+    date, #datetime or YYYY-MM-DD string
+    store=STORE,
+    ):
+    return os.path.join(
+        store,
+        "period=%d"%governance_period,
+        "date=%s"%pd.Timestamp(date).strftime("%Y-%m-%d"),
+        "snapshot.parquet",
+        )
+
+def write_snapshot(
+    df,
+    governance_period, #integer
+    date, #datetime or YYYY-MM-DD string
+    store=STORE,
+    row_group_size=8192,
+    ):
+    """Write (or replace) one snapshot partition; return its path."""
+    path = partition_path(governance_period,date,store=store)
+    os.makedirs(os.path.dirname(path),exist_ok=True)
+    df = df[COLUMNS].sort_values(
+        by="committed_algos",
+        ascending=False,
+        ).reset_index(drop=True)
+    df["address"] = df.address.astype("category")
+    with _store_lock(store):
+        book = addressbook(store)
+        df["address_id"] = book.encode(df.address)
+        book.save()
+        # write under an ignored name and rename, so a killed
+        # write never leaves a truncated partition behind:
+        temp_path = os.path.join(
+            os.path.dirname(path),
+            "_%s.%d.tmp"%(os.path.basename(path),os.getpid()),
+            )
+        df.to_parquet(temp_path,index=False,row_group_size=row_group_size)
+        os.replace(temp_path,path)
+        _update_metrics([snapshot_metrics(df,governance_period,date)],store)
+        _update_sketches([snapshot_sketches(df,governance_period,date)],store)
+    return path
+
+def import_hdf_snapshot(
+    hdf_path,
+    store=STORE,
+    ):
+    """Copy a bin/YYYY-MM-DD-algorand-governance-period-N.hdf file."""
+    match = re.search(
+        r"(\d{4}-\d{2}-\d{2})-algorand-governance-period-(\d+)\.hdf$",
+        hdf_path,
+        )
+    if match is None:
+        raise ValueError("not a governance snapshot file: %s"%hdf_path)
+    return write_snapshot(
+        pd.read_hdf(hdf_path),
+        int(match.group(2)),
+        match.group(1),
+        store=store,
+        )
+
+# -----------------------------------------------------
+# Read.
+# -----------------------------------------------------
+def snapshot_dates(
+    governance_period, #integer
+    store=STORE,
+    ):
+    """Return the sorted YYYY-MM-DD snapshot dates of a period."""
+    paths = glob.glob(os.path.join(
+        store,
+        "period=%d"%governance_period,
+        "date=*",
+        "snapshot.parquet",
+        ))
+    return sorted(
+        os.path.basename(os.path.dirname(x))[len("date="):]
+        for x in paths
+        )
+
+def latest_snapshot_date(
+    governance_period, #integer
+    store=STORE,
+    ):
+    dates = snapshot_dates(governance_period,store=store)
+    return dates[-1] if dates else None
+
+def read_governors(
+    periods=None, #integer or list of integers
+    dates=None, #date or list of dates
+    start=None, #first date, inclusive
+    end=None, #last date, inclusive
+    eligible=None, #True/False to filter on eligibility
+    min_committed=None, #committed algos strictly greater than
+    columns=None,
+    store=STORE,
+    ):
+    """Read governors, pushing every filter down to the dataset.
+
+    The 'period' and 'date' partition keys are returned as columns
+    unless 'columns' says otherwise.
+    """
+    def day(x):
+        return pd.Timestamp(x).strftime("%Y-%m-%d")
+
+    filters = []
+    if periods is not None:
+        if isinstance(periods,int):
+            periods = [periods]
+        filters.append(ds.field("period").isin(list(periods)))
+    if dates is not None:
+        if isinstance(dates,str) or not hasattr(dates,"__iter__"):
+            dates = [dates]
+        filters.append(ds.field("date").isin([day(x) for x in dates]))
+    if start is not None:
+        filters.append(ds.field("date") >= day(start))
+    if end is not None:
+        filters.append(ds.field("date") <= day(end))
+    if eligible is not None:
+        filters.append(ds.field("eligible") == bool(eligible))
+    if min_committed is not None:
+        filters.append(ds.field("committed_algos") > float(min_committed))
+    expression = None
+    for f in filters:
+        expression = f if expression is None else expression & f
+
+    dataset = ds.dataset(
+        store,
+        format="parquet",
+        partitioning=PARTITIONING,
+        ignore_prefixes=[".","_","addresses","metrics","sketches"],
+        )
+    table = dataset.to_table(columns=columns,filter=expression)
+    return table.to_pandas()
+
+def read_snapshot(
+    governance_period, #integer
+    date=None, #defaults to the latest snapshot
+    columns=SNAPSHOT_COLUMNS,
+    store=STORE,
+    **filters
+    ):
+    """Read a single snapshot in the original per-file layout."""
+    if date is None:
+        date = latest_snapshot_date(governance_period,store=store)
+    return read_governors(
+        periods=governance_period,
+        dates=date,
+        columns=columns,
+        store=store,
+        **filters
+        )
+
+# -----------------------------------------------------
+# Metrics table.
+# -----------------------------------------------------
+def snapshot_metrics(
+    df,
+    governance_period, #integer
+    date, #datetime or YYYY-MM-DD string
+    ):
+    """Return the metrics row of one snapshot as a dict."""
+    eligible = df.eligible.to_numpy(dtype=bool)
+    committed = df.committed_algos.to_numpy()
+    eligible_committed = committed[eligible].sum()
+    reward_pool = REWARD_POOLS.get(governance_period,np.nan)
+    return {
+        "period": governance_period,
+        "date": pd.Timestamp(date).strftime("%Y-%m-%d"),
+        "governors": len(df),
+        "committed_algos_all": committed.sum(),
+        "eligible_governors": int(eligible.sum()),
+        "committed_algos": eligible_committed,
+        "reward_pool": reward_pool,
+        "reward_rate": 1.0 + reward_pool/eligible_committed,
+        }
+
+def _metrics_path(store):
+    return os.path.join(store,"metrics.parquet")
+
+def _update_metrics(rows, store):
+    """Insert or replace metrics rows; callers hold _store_lock."""
+    path = _metrics_path(store)
+    new = pd.DataFrame(rows).set_index(["period","date"])
+    if os.path.exists(path):
+        metrics = pd.read_parquet(path)
+        metrics = pd.concat([metrics.drop(new.index,errors="ignore"),new])
+    else:
+        metrics = new
+    temp_path = "%s.tmp"%path
+    metrics.sort_index().to_parquet(temp_path)
+    os.replace(temp_path,path)
+
+def read_metrics(store=STORE):
+    """Return the metrics table, indexed by (period, date)."""
+    return pd.read_parquet(_metrics_path(store))
+
+def refresh_metrics(
+    periods=None, #defaults to every period in the store
+    store=STORE,
+    ):
+    """Compute the metrics rows and sketches missing for stored
+    snapshots; return the number of snapshots read."""
+    def stored_keys(path):
+        if not os.path.exists(path):
+            return set()
+        df = pd.read_parquet(path,columns=["period","date"]).reset_index()
+        return set(zip(df.period,df.date))
+    known_metrics = stored_keys(_metrics_path(store))
+    known_sketches = stored_keys(_sketches_path(store))
+    if periods is None:
+        periods = sorted(
+            int(os.path.basename(x)[len("period="):])
+            for x in glob.glob(os.path.join(store,"period=*"))
+            )
+    metrics = []
+    sketches = []
+    snapshots_read = 0
+    for governance_period in periods:
+        for date in snapshot_dates(governance_period,store=store):
+            key = (governance_period,date)
+            if key in known_metrics and key in known_sketches:
+                continue
+            df = read_snapshot(
+                governance_period,
+                date,
+                columns=["committed_algos","eligible"],
+                store=store,
+                )
+            snapshots_read += 1
+            if key not in known_metrics:
+                metrics.append(snapshot_metrics(df,governance_period,date))
+            if key not in known_sketches:
+                sketches.append(snapshot_sketches(df,governance_period,date))
+    with _store_lock(store):
+        if metrics:
+            _update_metrics(metrics,store)
+        if sketches:
+            _update_sketches(sketches,store)
+    return snapshots_read
+
+# -----------------------------------------------------
+# Quantile sketches.
+# -----------------------------------------------------
+def snapshot_sketches(
+    df,
+    governance_period, #integer
+    date, #datetime or YYYY-MM-DD string
+    accuracy=SKETCH_ACCURACY,
+    ):
+    """Return the sketch rows of one snapshot as a dataframe."""
+    eligible = df.eligible.to_numpy(dtype=bool)
+    committed = df.committed_algos.to_numpy(dtype=float)
+    frames = []
+    for name,mask in [("all",slice(None)),("eligible",eligible)]:
+        f = quantilesketch(accuracy).add(committed[mask]).to_frame()
+        f.insert(0,"slice",name)
+        frames.append(f)
+    df = pd.concat(frames,ignore_index=True)
+    df.insert(0,"period",governance_period)
+    df.insert(1,"date",pd.Timestamp(date).strftime("%Y-%m-%d"))
+    return df
+
+def _sketches_path(store):
+    return os.path.join(store,"sketches.parquet")
+
+def _update_sketches(frames, store):
+    """Insert or replace sketch rows; callers hold _store_lock."""
+    path = _sketches_path(store)
+    new = pd.concat(frames,ignore_index=True)
+    if os.path.exists(path):
+        sketches = pd.read_parquet(path)
+        replaced = pd.MultiIndex.from_frame(sketches[["period","date"]]).isin(
+            pd.MultiIndex.from_frame(new[["period","date"]]))
+        sketches = pd.concat([sketches[~replaced],new],ignore_index=True)
+    else:
+        sketches = new
+    temp_path = "%s.tmp"%path
+    sketches.sort_values(["period","date","slice","key"]).to_parquet(
+        temp_path,index=False)
+    os.replace(temp_path,path)
+
+def read_sketch(
+    periods=None, #integer or list of integers
+    dates=None, #date or list of dates
+    start=None, #first date, inclusive
+    end=None, #last date, inclusive
+    eligible=False, #True for the eligible governors' sketch
+    store=STORE,
+    ):
+    """Return the merged committed algos sketch of every matching
+    snapshot."""
+    df = pd.read_parquet(_sketches_path(store))
+    keep = df["slice"] == ("eligible" if eligible else "all")
+    if periods is not None:
+        if isinstance(periods,int):
+            periods = [periods]
+        keep &= df.period.isin(list(periods))
+    if dates is not None:
+        if isinstance(dates,str) or not hasattr(dates,"__iter__"):
+            dates = [dates]
+        keep &= df.date.isin([pd.Timestamp(x).strftime("%Y-%m-%d") for x in dates])
+    if start is not None:
+        keep &= df.date >= pd.Timestamp(start).strftime("%Y-%m-%d")
+    if end is not None:
+        keep &= df.date <= pd.Timestamp(end).strftime("%Y-%m-%d")
+    return quantilesketch.from_frame(df[keep])
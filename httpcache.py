@@ -0,0 +1,214 @@
+"""On-disk cache of raw web API responses.
+
+Responses are keyed by normalized URL and stored gzip-compressed in
+bin/http-cache/, so analyses can be re-run after a parsing change
+without querying the APIs again. The mode is set per process by the
+PUBLISH0X_HTTP_CACHE environment variable:
+
+    use      serve fresh cached responses, fetch and store the rest
+    refresh  always fetch, and store the response
+    replay   never touch the network; a missing entry is an error
+    off      bypass the cache
+
+Caching is opt-in per API: only URLs matching a TTL_POLICY pattern
+are cached, and requests carrying credentials never are (see
+PRIVATE_HEADERS). In replay mode both are refused with cachemiss.
+
+For example, to re-run a script deterministically from cache:
+
+    PUBLISH0X_HTTP_CACHE=replay python scrape-cmc.py
+
+Scripts that save live data under today's date, such as
+query-governance-api.py, refuse to run in replay mode.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from subprocess import Popen, PIPE
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# default cache location, shared by every post directory:
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(REPO_DIR,"bin","http-cache")
+MODES = ["use","refresh","replay","off"]
+
+# time-to-live policy of the cached APIs: the first pattern
+# found in the normalized URL sets how long a response stays
+# fresh (seconds; None never expires). URLs matching no
+# pattern are not cached. historical listings of a past
+# date do not change, governance data changes daily:
+TTL_POLICY = [
+    (r"/cryptocurrency/listings/historical\?", None),
+    (r"/governance-period-\d+/governors", 6*3600),
+    (r"api\.exchange\.coinbase\.com", 300),
+    ]
+
+class cachemiss(KeyError):
+    """Replay mode found no cached response for a URL."""
+
+def normalize_url(url):
+    """Lower-case scheme and host, drop default ports and fragments,
+    and sort query parameters."""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme,parts.port) not in [("http",80),("https",443)]:
+        host = "%s:%d"%(host,parts.port)
+    query = urlencode(sorted(parse_qsl(parts.query,keep_blank_values=True)))
+    return urlunsplit((scheme,host,parts.path or "/",query,""))
+
+class responsecache():
+    """Compressed response store with a TTL policy and replay mode."""
+    def __init__(
+        self,
+        cache_dir=CACHE_DIR,
+        mode="use",
+        ttl_policy=TTL_POLICY,
+        ):
+        if mode not in MODES:
+            raise ValueError("unknown cache mode '%s'; use one of %s"%(mode,MODES))
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.ttl_policy = [(re.compile(p),ttl) for p,ttl in ttl_policy]
+
+    def _rule(self, url):
+        for rule in self.ttl_policy:
+            if rule[0].search(url):
+                return rule
+        return None
+
+    def cacheable(self, url):
+        """True if a TTL_POLICY pattern covers the URL."""
+        return self._rule(normalize_url(url)) is not None
+
+    def ttl(self, url):
+        rule = self._rule(url)
+        return None if rule is None else rule[1]
+
+    def path(self, url):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.cache_dir,key[:2],"%s.gz"%key)
+
+    def get(self, url, ignore_ttl=False):
+        """Return the cached body of a URL, or None when missing or stale."""
+        url = normalize_url(url)
+        path = self.path(url)
+        if not os.path.exists(path):
+            return None
+        # entries are a one-line JSON header followed by the body:
+        with gzip.open(path,"rb") as fi:
+            entry = json.loads(fi.readline())
+            body = fi.read()
+        if entry["url"] != url:
+            return None
+        ttl = self.ttl(url)
+        if not ignore_ttl and ttl is not None:
+            if time.time() - entry["fetched"] > ttl:
+                return None
+        return body
+
+    def put(self, url, body):
+        url = normalize_url(url)
+        path = self.path(url)
+        os.makedirs(os.path.dirname(path),exist_ok=True)
+        entry = {
+            "url": url,
+            "fetched": time.time(),
+            }
+        temp_path = "%s.%d.%d.tmp"%(path,os.getpid(),threading.get_ident())
+        with gzip.open(temp_path,"wb") as of:
+            of.write(json.dumps(entry).encode()+b"\n")
+            of.write(body)
+        os.replace(temp_path,path)
+
+    def fetch(self, url, fetch):
+        """Return the body of url, calling fetch() only when needed."""
+        if self.mode == "off":
+            return fetch()
+        # uncached URLs are never found in replay mode:
+        if self.mode == "replay":
+            body = self.get(url,ignore_ttl=True)
+            if body is None:
+                raise cachemiss(url)
+            return body
+        if not self.cacheable(url):
+            return fetch()
+        if self.mode == "use":
+            body = self.get(url)
+            if body is not None:
+                return body
+        body = fetch()
+        self.put(url,body)
+        return body
+
+_default_cache = None
+def default_cache():
+    """Return the process-wide cache configured by PUBLISH0X_HTTP_CACHE."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = responsecache(
+            mode=os.environ.get("PUBLISH0X_HTTP_CACHE","use"),
+            )
+    return _default_cache
+
+# -----------------------------------------------------
+# curl queries.
+# -----------------------------------------------------
+# requests carrying any of these headers are private to
+# their credentials and never cached:
+PRIVATE_HEADERS = [
+    "authorization",
+    "cb-access-key",
+    ]
+
+def is_private(headers):
+    """True if any "Name: value" header is in PRIVATE_HEADERS."""
+    return any(
+        x.split(":",1)[0].strip().lower() in PRIVATE_HEADERS
+        for x in headers
+        )
+
+def curl(
+    url,
+    headers=(), #"Name: value" strings
+    ):
+    """Return curl's stdout for a GET request.
+
+    HTTP errors (4xx/5xx) raise IOError like any other curl failure,
+    so error bodies are never returned or cached.
+    """
+    cmd = ["curl","--fail","--silent","--show-error",url]
+    for header in headers:
+        cmd += ["--header",header]
+    p = Popen(cmd,stdout=PIPE,stderr=PIPE)
+    stdout,stderr = p.communicate()
+    if p.returncode != 0:
+        raise IOError("curl failed (%d) for %s: %s"%(
+            p.returncode,url,stderr.decode(errors="replace")))
+    return stdout
+
+def cached_curl(
+    url,
+    headers=(), #"Name: value" strings
+    cache=None, #responsecache; None for the default, False for none
+    ):
+    """curl() through the response cache.
+
+    Authenticated requests (see PRIVATE_HEADERS) bypass the cache:
+    entries are keyed by URL only, so a cached private response
+    would be served to any other credentials. In replay mode they
+    raise cachemiss instead of reaching the network.
+    """
+    if cache is None:
+        cache = default_cache()
+    if is_private(headers):
+        if (cache or default_cache()).mode == "replay":
+            raise cachemiss(url)
+        return curl(url,headers)
+    if cache is False:
+        return curl(url,headers)
+    return cache.fetch(url,lambda: curl(url,headers))
@@ -0,0 +1,52 @@
+"""Append-only key <-> int32 id dictionaries shared by the stores.
+
+A book gives every key (a governor address, a coinmarketcap coin) a
+permanent int32 id: the key's position in one parquet column. Ids are
+never reused or renumbered, so ids already written into stored data
+stay valid as the book grows. Writers hold their store's filelock
+from loading a book until it is saved.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+class idbook():
+    """Append-only key <-> int32 id dictionary kept in one parquet
+    column."""
+    def __init__(
+        self,
+        path, #parquet file
+        column, #name of the key column
+        ):
+        self.path = path
+        self.column = column
+        if os.path.exists(path):
+            keys = pd.read_parquet(path,columns=[column])[column].astype(str)
+        else:
+            keys = pd.Series([],dtype=str)
+        self.index = pd.Index(keys.values)
+
+    def __len__(self):
+        return len(self.index)
+
+    def encode(self, keys, add=True):
+        """Return int32 ids; unknown keys get new ids (or -1)."""
+        keys = np.asarray(keys).astype(str)
+        ids = self.index.get_indexer(keys)
+        unknown = ids < 0
+        if add and unknown.any():
+            new = pd.unique(keys[unknown])
+            self.index = self.index.append(pd.Index(new))
+            ids[unknown] = self.index.get_indexer(keys[unknown])
+        return ids.astype(np.int32)
+
+    def decode(self, ids):
+        return np.asarray(self.index)[np.asarray(ids)]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path),exist_ok=True)
+        temp_path = "%s.tmp"%self.path
+        pd.DataFrame({self.column: np.asarray(self.index).astype(str)}).to_parquet(
+            temp_path,index=False)
+        os.replace(temp_path,self.path)
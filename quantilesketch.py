@@ -0,0 +1,111 @@
+"""Mergeable quantile sketch with a relative error bound.
+
+Values are counted in logarithmic buckets (the DDSketch layout):
+bucket k holds values in (gamma**(k-1), gamma**k] with
+
+    gamma = (1 + relative_accuracy)/(1 - relative_accuracy)
+
+so any quantile read from the sketch is within relative_accuracy of
+the exact value at that rank. Sketches with the same accuracy merge
+by adding bucket counts, which makes percentiles across dates or
+periods answerable from the sketches alone. Size grows with the
+log of the value range, not with the number of values: 0.5%
+accuracy over 1e-6 to 1e10 Algo takes at most ~3700 buckets.
+"""
+import numpy as np
+import pandas as pd
+
+# key of the zero bucket in to_frame() output:
+ZERO_KEY = np.iinfo(np.int32).min
+
+class quantilesketch():
+    """Relative-error quantile sketch of non-negative values."""
+    def __init__(
+        self,
+        relative_accuracy=0.005,
+        min_value=1e-9, #smaller values count as zero
+        ):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1.0+relative_accuracy)/(1.0-relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.keys = np.array([],dtype=np.int32)
+        self.counts = np.array([],dtype=np.int64)
+        self.zero_count = 0
+
+    @property
+    def count(self):
+        return int(self.counts.sum()) + self.zero_count
+
+    def __len__(self):
+        return self.count
+
+    def _add_buckets(self, keys, counts):
+        keys = np.concatenate([self.keys,keys])
+        counts = np.concatenate([self.counts,counts])
+        self.keys,inverse = np.unique(keys,return_inverse=True)
+        self.counts = np.bincount(
+            inverse,weights=counts,minlength=len(self.keys)).astype(np.int64)
+        self.keys = self.keys.astype(np.int32)
+
+    def add(self, values):
+        """Count an array of values; returns self."""
+        values = np.asarray(values,dtype=float)
+        values = values[~np.isnan(values)]
+        if (values < 0).any():
+            raise ValueError("quantilesketch only holds non-negative values")
+        positive = values > self.min_value
+        self.zero_count += int((~positive).sum())
+        keys = np.ceil(np.log(values[positive])/self.log_gamma).astype(np.int32)
+        keys,counts = np.unique(keys,return_counts=True)
+        self._add_buckets(keys,counts)
+        return self
+
+    def merge(self, other):
+        """Add another sketch's counts; returns self."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge sketches of different accuracy")
+        self._add_buckets(other.keys,other.counts)
+        self.zero_count += other.zero_count
+        return self
+
+    def quantile(self, q):
+        """Value at quantile(s) q, within relative_accuracy of the
+        exact value at rank floor(q*(count-1))."""
+        q = np.asarray(q,dtype=float)
+        if self.count == 0:
+            return np.full(q.shape,np.nan)
+        ranks = np.floor(q*(self.count-1))
+        # bucket of each rank; the zero bucket comes first:
+        cumulative = self.zero_count + np.cumsum(self.counts)
+        bucket = np.searchsorted(cumulative,ranks,side="right")
+        bucket = np.minimum(bucket,len(self.keys)-1)
+        values = 2.0*self.gamma**self.keys[bucket]/(self.gamma+1.0)
+        return np.where(ranks < self.zero_count,0.0,values)
+
+    def to_frame(self):
+        """Bucket keys and counts; the zero bucket has key ZERO_KEY."""
+        keys = np.concatenate([[ZERO_KEY],self.keys]).astype(np.int32)
+        counts = np.concatenate([[self.zero_count],self.counts]).astype(np.int64)
+        return pd.DataFrame({
+            "key": keys,
+            "count": counts,
+            "relative_accuracy": self.relative_accuracy,
+            })
+
+    @classmethod
+    def from_frame(cls, df):
+        """Inverse of to_frame(); rows of several sketches are merged."""
+        accuracy = df.relative_accuracy.unique()
+        if len(accuracy) == 0:
+            return cls()
+        if len(accuracy) != 1:
+            raise ValueError("cannot merge sketches of different accuracy")
+        sketch = cls(relative_accuracy=float(accuracy[0]))
+        zero = df.key.to_numpy() == ZERO_KEY
+        sketch.zero_count = int(df["count"].to_numpy()[zero].sum())
+        sketch._add_buckets(
+            df.key.to_numpy()[~zero].astype(np.int32),
+            df["count"].to_numpy()[~zero].astype(np.int64),
+            )
+        return sketch
@@ -0,0 +1,190 @@
+"""Local stand-in for the web API's queried throughout the repository.
+
+Serves synthetic data over keep-alive HTTP/1.1 on localhost so the
+fetchers can be exercised and benchmarked offline. An optional
+per-request latency emulates the round trip to the real servers, and
+a per-item latency the time they take to build large responses.
+"""
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# base32 alphabet used by Algorand addresses:
+ADDRESS_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ234567"
+
+# -----------------------------------------------------
+# Synthetic data.
+# -----------------------------------------------------
+def synthetic_governors(
+    number_of_governors,
+    seed=0,
+    period_start=datetime(2022,1,1),
+    ):
+    """Return governor 'results' items ordered newest registration first."""
+    rng = random.Random(seed)
+    governors = []
+    for i in range(number_of_governors):
+        address = "".join(rng.choice(ADDRESS_ALPHABET) for _ in range(58))
+        registration = period_start + timedelta(seconds=60*i+rng.randint(0,59))
+        governors.append({
+            "account": {"address": address},
+            "committed_algo_amount": str(int(rng.paretovariate(1.2)*1e8)),
+            "is_eligible": rng.random() > 0.15,
+            "registration_datetime": (
+                registration.strftime("%Y-%m-%dT%H:%M:%S.%f")+"Z"),
+            })
+    governors.reverse()
+    return governors
+
+def synthetic_listings(
+    date, #datetime or YYYY-MM-DD string
+    number_of_coins,
+    seed=0,
+    ):
+    """Return coinmarketcap historical listing 'data' items of a date,
+    ordered by cmc_rank.
+
+    Coin names are stable across dates; each coin's market cap
+    drifts from week to week, so ranks change.
+    """
+    date = datetime.strptime(str(date)[:10],"%Y-%m-%d")
+    week = (date - datetime(2020,1,5)).days//7
+    rng = random.Random("%d-%d"%(seed,week))
+    coins = []
+    for i in range(number_of_coins):
+        # base market cap falls off with the coin's id:
+        market_cap = 1e12/(i+1)**1.5*rng.lognormvariate(0.0,0.5)
+        price = market_cap/rng.uniform(1e6,1e10)
+        coins.append({
+            "id": i+1,
+            "name": "Coin %d"%(i+1),
+            "symbol": "C%d"%(i+1),
+            "quote": {
+                "USD": {
+                    "price": price,
+                    "volume_24h": market_cap*rng.uniform(0.01,0.3),
+                    "percent_change_1h": rng.gauss(0.0,1.0),
+                    "percent_change_24h": rng.gauss(0.0,5.0),
+                    "percent_change_7d": rng.gauss(0.0,15.0),
+                    "market_cap": market_cap,
+                    "last_updated": date.strftime("%Y-%m-%dT23:59:59.000Z"),
+                    },
+                },
+            })
+    coins.sort(key=lambda x: -x["quote"]["USD"]["market_cap"])
+    for rank,coin in enumerate(coins):
+        coin["cmc_rank"] = rank+1
+    return coins
+
+# -----------------------------------------------------
+# Server.
+# -----------------------------------------------------
+class _handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        status, payload = self.server.route(self.path)
+        body = json.dumps(payload).encode()
+        items = len(payload.get("results",payload.get("data",[])))
+        delay = self.server.latency + self.server.item_latency*items
+        if delay:
+            time.sleep(delay)
+        self.send_response(status)
+        self.send_header("Content-Type","application/json")
+        self.send_header("Content-Length",str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class standinserver(ThreadingHTTPServer):
+    """Threaded localhost server; run with start() and stop()."""
+    daemon_threads = True
+    governors_path = re.compile(r"^/api/periods/governance-period-(\d+)/governors/?$")
+    governor_path = re.compile(
+        r"^/api/periods/governance-period-(\d+)/governors/([A-Z2-7]+)/?$")
+    listings_path = re.compile(r"^/v1/cryptocurrency/listings/historical/?$")
+
+    def __init__(
+        self,
+        latency=0.0, #s
+        error_rate=0.0, #fraction of requests answered with HTTP 503
+        item_latency=0.0, #s per returned item, e.g. server-side query time
+        port=0,
+        ):
+        ThreadingHTTPServer.__init__(self,("127.0.0.1",port),_handler)
+        self.latency = latency
+        self.item_latency = item_latency
+        self.error_rate = error_rate
+        self._rng = random.Random(0)
+        self.governors = {}
+        self.number_of_coins = 2500 #coinmarketcap listings per date
+        self._listings = {}
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return "http://127.0.0.1:%d"%self.server_address[1]
+
+    @property
+    def governance_api(self):
+        return "%s/api"%self.base_url
+
+    @property
+    def cmc_api(self):
+        return "%s/v1"%self.base_url
+
+    def listings(self, date):
+        """Synthetic listings of a date, generated once."""
+        with self._lock:
+            if date not in self._listings:
+                self._listings[date] = synthetic_listings(date,self.number_of_coins)
+            return self._listings[date]
+
+    def route(self, path):
+        with self._lock:
+            self.request_count += 1
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return 503, {"detail": "Service unavailable."}
+        parts = urlsplit(path)
+        query = {k: v[-1] for k,v in parse_qs(parts.query).items()}
+        match = self.governors_path.match(parts.path)
+        if match and int(match.group(1)) in self.governors:
+            governors = self.governors[int(match.group(1))]
+            offset = int(query.get("offset",0))
+            limit = int(query.get("limit",100))
+            return 200, {
+                "count": len(governors),
+                "results": governors[offset:offset+limit],
+                }
+        match = self.governor_path.match(parts.path)
+        if match and int(match.group(1)) in self.governors:
+            for item in self.governors[int(match.group(1))]:
+                if item["account"]["address"] == match.group(2):
+                    return 200, item
+        if self.listings_path.match(parts.path) and "date" in query:
+            start = int(query.get("start",1))
+            limit = int(query.get("limit",100))
+            return 200, {
+                "status": {"error_code": 0},
+                "data": self.listings(query["date"])[start-1:start-1+limit],
+                }
+        return 404, {"detail": "Not found."}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever,daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
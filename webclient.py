@@ -0,0 +1,246 @@
+"""Small HTTP client shared by the repository's web API fetchers.
+
+Keep-alive connection pooling and a per-host request budget, built on
+the standard library only. Responses of the APIs listed in
+httpcache.TTL_POLICY go through the on-disk response cache
+(httpcache.py) unless the pool is created with cache=False; other
+hosts are not cached.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPSConnection
+from http.client import HTTPException
+from queue import LifoQueue, Empty, Full
+from urllib.parse import urlsplit
+
+# personal modules:
+import httpcache
+
+# request headers used by the original curl queries:
+HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+    }
+
+# HTTP statuses worth retrying:
+TRANSIENT_STATUSES = (429,500,502,503,504)
+
+# -----------------------------------------------------
+# Per-host request budget.
+# -----------------------------------------------------
+class ratelimiter():
+    """Token bucket plus a cap on concurrent requests.
+
+    Use as a context manager around each request. Tokens refill at
+    requests_per_second up to 'burst'; callers that find the bucket
+    empty reserve the next token and sleep until it is due, so
+    waiting requests are served in arrival order.
+    """
+    def __init__(
+        self,
+        requests_per_second,
+        burst=1,
+        max_concurrent=None,
+        ):
+        self.rate = float(requests_per_second)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self._slots = None
+        if max_concurrent is not None:
+            self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now-self._last)*self.rate,
+                )
+            self._last = now
+            self._tokens -= 1.0
+            wait = -self._tokens/self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+    def __enter__(self):
+        if self._slots is not None:
+            self._slots.acquire()
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        if self._slots is not None:
+            self._slots.release()
+
+# -----------------------------------------------------
+# HTTP connection pool.
+# -----------------------------------------------------
+class apierror(IOError):
+    """Non-200 response returned by the API."""
+    def __init__(self, status, url):
+        self.status = status
+        self.url = url
+        IOError.__init__(self,"HTTP %d returned by %s"%(status,url))
+
+def is_transient(error):
+    """True for errors a retry may fix: dropped connections, timeouts,
+    rate limiting and server-side errors."""
+    if isinstance(error,apierror):
+        return error.status in TRANSIENT_STATUSES
+    return isinstance(error,(HTTPException,OSError))
+
+class connectionpool():
+    """Thread-safe pool of keep-alive connections to one host."""
+    def __init__(
+        self,
+        base_url,
+        maxsize=8,
+        timeout=30, #s
+        limiter=None, #ratelimiter shared by every user of the host
+        retries=4,
+        backoff=0.5, #s, doubled after every failed attempt
+        max_backoff=30.0, #s
+        cache=None, #responsecache; None for the default, False for none
+        ):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.timeout = timeout
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        if cache is None:
+            cache = httpcache.default_cache()
+        self.cache = cache
+        self.request_count = 0 #requests sent, retries included
+        self._count_lock = threading.Lock()
+        self._idle = LifoQueue(maxsize)
+
+    def _connect(self):
+        if self.scheme == "https":
+            return HTTPSConnection(self.host,self.port,timeout=self.timeout)
+        return HTTPConnection(self.host,self.port,timeout=self.timeout)
+
+    def _request(self, conn, path, headers):
+        conn.request("GET",path,headers=headers)
+        response = conn.getresponse()
+        return response, response.read()
+
+    def get(self, url, headers=HEADERS):
+        """Return the body of a GET request; raise apierror on non-200.
+
+        Transient failures are retried up to 'retries' times with
+        jittered exponential backoff.
+        """
+        if self.cache:
+            return self.cache.fetch(url,lambda: self._get_retrying(url,headers))
+        return self._get_retrying(url,headers)
+
+    def _get_retrying(self, url, headers):
+        attempt = 0
+        while True:
+            try:
+                if self.limiter is None:
+                    return self._get(url,headers)
+                with self.limiter:
+                    return self._get(url,headers)
+            except (HTTPException, OSError) as error:
+                if attempt >= self.retries or not is_transient(error):
+                    raise
+            delay = min(self.max_backoff,self.backoff*2**attempt)
+            time.sleep(delay*random.uniform(0.5,1.0))
+            attempt += 1
+
+    def _get(self, url, headers):
+        with self._count_lock:
+            self.request_count += 1
+        parts = urlsplit(url)
+        path = parts.path
+        if parts.query:
+            path = "%s?%s"%(path,parts.query)
+
+        # reuse an idle connection when there is one. a reused
+        # connection may have been closed by the server while
+        # idle, so retry once on a fresh connection:
+        try:
+            conn, reused = self._idle.get_nowait(), True
+        except Empty:
+            conn, reused = self._connect(), False
+        try:
+            response, body = self._request(conn,path,headers)
+        except (HTTPException, OSError):
+            conn.close()
+            if not reused:
+                raise
+            conn = self._connect()
+            try:
+                response, body = self._request(conn,path,headers)
+            except (HTTPException, OSError):
+                conn.close()
+                raise
+
+        # return the connection to the pool unless the server
+        # asked to close it:
+        if response.will_close:
+            conn.close()
+        else:
+            try:
+                self._idle.put_nowait(conn)
+            except Full:
+                conn.close()
+        if response.status != 200:
+            raise apierror(response.status,url)
+        return body
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                break
+
+# -----------------------------------------------------
+# Windowed pager.
+# -----------------------------------------------------
+def iter_pages(
+    fetch, #fetch(page) -> contents, run on worker threads
+    is_last, #is_last(contents) -> True for the final page
+    start_page=0,
+    max_pages=800, #pages are numbered below max_pages
+    max_in_flight=8,
+    ):
+    """Yield (page, contents) in page order.
+
+    Up to max_in_flight pages ahead of the consumer are fetched
+    concurrently. Iteration stops after the page is_last() accepts,
+    or when the consumer stops iterating; speculative requests beyond
+    that point are cancelled or discarded.
+    """
+    executor = ThreadPoolExecutor(max_in_flight)
+    pending = {}
+    next_page = start_page
+    current_page = start_page
+    try:
+        while current_page < max_pages:
+
+            # keep the request window full:
+            while (next_page < max_pages
+                and next_page - current_page < max_in_flight):
+                pending[next_page] = executor.submit(fetch,next_page)
+                next_page += 1
+            contents = pending.pop(current_page).result()
+            yield current_page, contents
+            if is_last(contents):
+                break
+            current_page += 1
+    finally:
+        for future in pending.values():
+            future.cancel()
+        executor.shutdown(wait=True)